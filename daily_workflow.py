@@ -8,7 +8,7 @@ Now runs 35 minutes before first game (not fixed 2:30pm)
 import os
 import sys
 import json
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 
 # Load environment variables
@@ -22,7 +22,7 @@ except ImportError:
 # Import our modules
 try:
     from generate_picks import generate_picks_json
-    from upload_to_supabase import upload_picks_to_supabase
+    from upload_to_supabase import configure_logging, upload_picks_to_supabase
     from get_schedule import get_first_game_time, calculate_workflow_times
 except ImportError as e:
     print(f"Error importing modules: {e}")
@@ -87,8 +87,8 @@ def run_daily_workflow():
     # ========== STEP 2: Upload to Supabase ==========
     print("\n💾 STEP 2: Uploading to Supabase...")
     try:
-        result = upload_picks_to_supabase(picks)
-        print(f"✓ Uploaded picks for {result['date']}")
+        upload_picks_to_supabase(picks)
+        print(f"✓ Uploaded picks for {date.today().isoformat()}")
         
     except Exception as e:
         print(f"✗ Error uploading to Supabase: {e}")
@@ -113,4 +113,5 @@ def run_daily_workflow():
         print("   (Email sending will be implemented in next step)")
 
 if __name__ == "__main__":
+    configure_logging()
     run_daily_workflow()
\ No newline at end of file
@@ -9,6 +9,8 @@ import sys
 import json
 from datetime import datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment
 try:
@@ -22,6 +24,16 @@ SPORT = "basketball_nba"
 REGIONS = "us"
 ODDS_FORMAT = "american"
 
+# Shared keep-alive session (same setup as nba_bettor.SESSION)
+SESSION = requests.Session()
+SESSION.headers.update({"Accept-Encoding": "gzip, deflate"})
+adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+)
+SESSION.mount("https://", adapter)
+
 
 def get_first_game_time(target_date=None):
     """
@@ -46,7 +58,7 @@ def get_first_game_time(target_date=None):
     
     try:
         print(f"[SCHEDULE] Checking for games on {target_date.strftime('%Y-%m-%d')}...")
-        r = requests.get(url, params=params, timeout=15)
+        r = SESSION.get(url, params=params, timeout=15)
         r.raise_for_status()
         games = r.json()
         
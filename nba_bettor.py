@@ -34,6 +34,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING
 
 import itertools
+import functools
+import heapq
+import operator
+import re
 from io import StringIO
 
 if TYPE_CHECKING:
@@ -84,7 +88,7 @@ except Exception:
     tkfont = None
 
 try:
-    from PIL import Image, ImageTk, ImageDraw
+    from PIL import Image, ImageTk, ImageDraw, ImageChops
     HAS_PIL = True
 except Exception:
     HAS_PIL = False
@@ -181,6 +185,10 @@ DEFAULT_MIN_EV      = 2.0
 DEFAULT_BANKROLL    = 1000.0
 DEFAULT_TOP_N       = 10
 KELLY_CAP_PCT       = 2.5
+_KELLY_CAP_FRAC     = KELLY_CAP_PCT / 100.0
+
+# Correlation haircut by penalty points: each point ≈ 1% reduction, floored at 50%
+_HAIRCUT = tuple(max(0.5, 1.0 - i / 100.0) for i in range(101))
 
 BADGE_THRESHOLDS = {"HIGH": 70, "MED": 60, "LOW": 55}
 
@@ -283,6 +291,7 @@ TEAM_ALIASES: Dict[str, str] = {
     "utah jazz":"UTA","jazz":"UTA","uta":"UTA",
 }
 
+@functools.lru_cache(maxsize=256)  # small fixed vocabulary; called per event/row in filters
 def team_key(name: str) -> str:
     s = (name or "").strip().lower()
     s = " ".join(s.replace(".", "").replace("-", " ").split())
@@ -378,6 +387,16 @@ def _parlay_metrics(legs: List[Dict[str, Any]]) -> Tuple[float, float, float]:
     ev = p * dec - 1.0
     return p, dec, round(ev * 100.0, 2)
 
+def _parlay_metrics_fast(legs: List[Dict[str, Any]]) -> Tuple[float, float, float]:
+    """_parlay_metrics for legs already stamped with "_p" / "_dec" (see _build_parlay_lists)."""
+    p = 1.0
+    dec = 1.0
+    for r in legs:
+        p *= r["_p"]
+        dec *= r["_dec"]
+    p *= _parlay_independence_discount(legs)
+    return p, dec, round((p * dec - 1.0) * 100.0, 2)
+
 # =============================== Local storage ==============================
 def load_book_weights():
     try:
@@ -421,7 +440,23 @@ def db_init():
     cur.execute("CREATE INDEX IF NOT EXISTS ix_ticks_ts ON ticks(ts)")
     con.commit(); con.close()
 
-BOOK_WEIGHTS = load_book_weights()
+def set_book_weights(weights: dict):
+    """Install a weights map and rebuild the float snapshot read by book_weight()."""
+    global BOOK_WEIGHTS, _BOOK_W
+    if not isinstance(weights, dict):
+        weights = DEFAULT_WEIGHTS.copy()
+    snap: Dict[str, float] = {}
+    for k, v in weights.items():
+        try:
+            snap[k] = float(v)
+        except Exception:
+            snap[k] = 1.0
+    BOOK_WEIGHTS = weights
+    _BOOK_W = snap
+
+BOOK_WEIGHTS: dict = {}
+_BOOK_W: Dict[str, float] = {}
+set_book_weights(load_book_weights())
 db_init()
 
 def _db_execmany(sql: str, rows: List[tuple], tries: int = 4, sleep_s: float = 0.08):
@@ -1387,13 +1422,8 @@ def trimmed_weighted_mean(values, weights, trim=0.15):
     return (num/den) if den else None
 
 def book_weight(book_key: str) -> float:
-    global BOOK_WEIGHTS
-    if not isinstance(BOOK_WEIGHTS, dict):
-        BOOK_WEIGHTS = DEFAULT_WEIGHTS.copy()
-    try:
-        return float(BOOK_WEIGHTS.get(book_key, 1.0))
-    except Exception:
-        return 1.0
+    # Pre-coerced snapshot from set_book_weights(); one dict hit per book per side
+    return _BOOK_W.get(book_key, 1.0)
 
 def db_log_tick(rows_for_event: List[tuple]):
     _db_execmany("""INSERT INTO ticks
@@ -1406,15 +1436,34 @@ def db_log_bets(bets_rows: List[tuple]):
         VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)""", bets_rows)
 
 def last_10min_move(event_id: str, player: str, market: str, line: float, side: str):
-    now = int(time.time()); since = now - 600
-    con = sqlite3.connect(DB_PATH); cur = con.cursor()
-    cur.execute("""
-        SELECT ts, book, price FROM ticks
-        WHERE ts>=? AND event_id=? AND player=? AND market=? 
-        AND line BETWEEN ? AND ? AND side=?
-    """, (since, event_id, player, market, 
-        float(line) - 0.01, float(line) + 0.01, side))
-    rows = cur.fetchall(); con.close()
+    key = (event_id, player, market, float(line), side)
+    return last_10min_moves([key])[key]
+
+def last_10min_moves(keys) -> Dict[tuple, tuple]:
+    """Batched last_10min_move over (event_id, player, market, line, side) keys: one connection, one result per unique key."""
+    out: Dict[tuple, tuple] = {}
+    if not keys:
+        return out
+    since = int(time.time()) - 600
+    con = sqlite3.connect(DB_PATH)
+    try:
+        cur = con.cursor()
+        for key in keys:
+            if key in out:
+                continue
+            event_id, player, market, line, side = key
+            cur.execute("""
+                SELECT ts, book, price FROM ticks
+                WHERE ts>=? AND event_id=? AND player=? AND market=? 
+                AND line BETWEEN ? AND ? AND side=?
+            """, (since, event_id, player, market, 
+                float(line) - 0.01, float(line) + 0.01, side))
+            out[key] = _move_from_ticks(cur.fetchall())
+    finally:
+        con.close()
+    return out
+
+def _move_from_ticks(rows):
     if not rows: return 0, 0
     
     first, last = {}, {}
@@ -1641,6 +1690,605 @@ def negative_binomial_hit_prob(mean: float, variance: float, line: float, side:
     return poisson_hit_prob(mean, line, side)
 
 # =============================== Scanning logic =============================
+def _best_and_avg_gap(book_map: Dict[str, Dict[str, int]], side_key: str,
+                      fd_price: int) -> tuple[int, Optional[str], Optional[int], int]:
+    """
+    FanDuel's gap (in cents) vs. the best and the average other-book quote for one side.
+    Only quotes with the same sign as FanDuel are compared. Within one sign the
+    better price for the bettor is always the larger number (+150 > +140, -110 > -120),
+    so the best quote is a plain max() instead of a pairwise compare per book.
+    """
+    fd_price_i = int(fd_price)
+    fd_sign_positive = (fd_price_i >= 0)
+
+    quotes: List[tuple[str, int]] = []
+    for b, sides in book_map.items():
+        if b == FANDUEL_KEY or side_key not in sides:
+            continue
+        try:
+            quotes.append((b, int(sides[side_key])))
+        except Exception:
+            continue
+
+    # Skip opposite-sign quotes
+    same_sign = [q for q in quotes if (q[1] >= 0) == fd_sign_positive]
+    if not same_sign:
+        return 0, None, None, 0
+
+    best_other_book, best_other_price = max(same_sign, key=lambda q: q[1])
+    avg_other = int(round(sum(p for _, p in same_sign) / len(same_sign)))
+
+    return (cents_diff(fd_price_i, best_other_price), best_other_book,
+            best_other_price, cents_diff(fd_price_i, avg_other))
+
+# Event context / filter fields every _process_*_market handler reads
+_common_ctx = operator.itemgetter(
+    "evt", "matchup", "tip_short", "window_mode", "min_books", "trim_used", "min_ev",
+    "require_ev", "require_gap", "min_gap_cents", "min_avg_gap_cents", "min_true_prob_pct",
+)
+
+def _process_props_market(who: str, market_key: str, line: float, book_map: Dict[str, Dict[str, int]],
+                          ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Score both sides of one FanDuel player prop against the other books."""
+    (evt, matchup, tip_short, window_mode, min_books, trim_used, min_ev, require_ev, require_gap,
+     min_gap_cents, min_avg_gap_cents, min_true_prob_pct) = _common_ctx(ctx)
+    line_book_map, steam_window_sec = ctx["line_book_map"], ctx["steam_window_sec"]
+
+    out_rows: List[Dict[str, Any]] = []
+    for side in ("Over","Under"):
+        if FANDUEL_KEY not in book_map or side not in book_map[FANDUEL_KEY]:
+            continue
+        fd_price = book_map[FANDUEL_KEY][side]
+
+        # ✅ FIXED: Apply odds filter FIRST for props
+        if window_mode in ("pretip", "plus_odds"):  # ✅ Add plus_odds
+            preset = WINDOW_PRESETS.get(window_mode, {})
+            mode = preset.get("mode")
+            if mode in ("confidence", "plus_odds"):  # ✅ Add plus_odds
+                fd_odds_min = preset.get("fd_odds_min", -999)
+                fd_odds_max = preset.get("fd_odds_max", 999)
+                if not (fd_odds_min <= fd_price <= fd_odds_max):
+                    continue
+
+        cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap(book_map, side, fd_price)
+
+        fair_probs: List[float] = []
+        fair_wgts:  List[float] = []
+        contributors_side_count = 0
+        for b, sides in book_map.items():
+            if side in sides:
+                contributors_side_count += 1
+            if b == FANDUEL_KEY: 
+                continue
+            if "Over" in sides and "Under" in sides:
+                p_over  = american_to_implied_prob(sides["Over"])
+                p_under = american_to_implied_prob(sides["Under"])
+                denom = p_over + p_under
+                if denom > 0:
+                    fair_over  = p_over / denom
+                    fair_under = 1.0 - fair_over
+                    fair_probs.append(fair_over if side == "Over" else fair_under)
+                    fair_wgts.append(book_weight(b))
+        books_used = len(fair_probs)
+        if books_used < min_books:
+            continue
+
+        market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
+        if market_prob is None:
+            continue
+
+        if len(fair_probs) >= 4:
+            qs = sorted(fair_probs); q = statistics.quantiles(qs, n=4)
+            q1, q3 = q[0], q[2]; iqr = max(1e-6, q3-q1)
+        elif len(fair_probs) == 3:
+            qs = sorted(fair_probs); iqr = max(1e-6, (qs[2]-qs[0]) * 0.5)
+        else:
+            iqr = 0.20
+
+        stat_key = {"player_points":"pts","player_rebounds":"reb","player_assists":"ast","player_threes":"fg3m"}.get(market_key)
+        p_model = None
+        cv = 0.0
+
+        if stat_key:
+            mean, stdev, cv = get_player_variance_stats(who, stat_key, n=10)
+
+            if cv > 0.6:
+                variance = stdev ** 2 if stdev > 0 else mean * 1.5
+                p_model = negative_binomial_hit_prob(mean, variance, line, side)
+                variance_penalty = min(0.15, cv * 0.1)
+                p_model = p_model * (1 - variance_penalty)
+            else:
+                mu = rolling_player_mean(who, stat_key, n=10)
+                p_model = poisson_hit_prob(mu, line, side)
+
+        true_prob = market_prob
+
+        if p_model is not None:
+            if cv > 0.6:
+                alpha_market = 0.90
+            elif cv > 0.4:
+                alpha_market = 0.85
+            else:
+                alpha_market = max(0.75, min(0.90, 0.90 - iqr/0.35))
+
+            true_prob = alpha_market * market_prob + (1.0 - alpha_market) * p_model
+
+        p_lo, p_hi = min(fair_probs), max(fair_probs)
+        buffer = 0.05
+        true_prob = max(p_lo - buffer, min(p_hi + buffer, true_prob))
+        p_med = statistics.median(fair_probs)
+        true_prob = min(true_prob, p_med + 0.10)
+        true_prob = max(true_prob, p_med - 0.10)
+
+        lm_key = (who, market_key)
+        other_lines: List[float] = []
+        if lm_key in line_book_map:
+            for b, st in line_book_map[lm_key].items():
+                if b == FANDUEL_KEY: continue
+                if not st: continue
+                try:
+                    nearest = min(st, key=lambda L: abs(float(L) - float(line)))
+                    other_lines.append(float(nearest))
+                except Exception:
+                    pass
+        adv = line_advantage(line, other_lines, side)
+        worse_ct = count_worse_line(line, other_lines, side)
+
+        # ✅ Calculate ALL adjustments BEFORE filtering
+        inj_adj, inj_tag = injury_confidence_adjust(who)
+        min_adj, min_tag = minutes_confidence_adjust(who)
+        steam_adj = steam_boost(evt["id"], who, market_key, line, side, window_sec=steam_window_sec)
+
+        alt_shape_bonus = 1.5 if (worse_ct >= 2 and adv > 0.25) else 0.0
+
+        adj_tags_list = []
+        if inj_tag:
+            adj_tags_list.append(inj_tag)
+        if min_tag:
+            adj_tags_list.append(min_tag)
+        if steam_adj > 0:
+            adj_tags_list.append("steam")
+        adj_tags_str = ",".join(adj_tags_list)
+
+        fd_dec = american_to_decimal(fd_price)
+        ev_val = true_prob * fd_dec - 1.0
+        ev_pct = round(ev_val * 100.0, 2)
+
+        # ✅ Now filter AFTER we have all adjustments
+        edge_ok = True
+        if require_gap:
+            if window_mode == "morning":
+                edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
+            else:
+                edge_ok = (cents_delta >= min_gap_cents)
+        prob_ok = True
+        if min_true_prob_pct > 0:
+            prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct)
+        ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
+
+        if not (edge_ok and prob_ok and ev_ok):
+            continue
+
+        # ✅ Calculate confidence WITH adjustments
+        if window_mode == "plus_odds":  # ✅ NEW
+            conf, badge = plus_odds_confidence_score(
+                true_prob, fd_price, cents_delta, books_used,
+                inj_adj=inj_adj, min_adj=min_adj
+            )
+        else:
+            conf, badge = confidence_score_from_prob(
+                true_prob, inj_adj=inj_adj, min_adj=min_adj, steam_adj=steam_adj
+            )
+
+        if conf < min_true_prob_pct:
+            continue  # Skip bets below confidence threshold
+
+        k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
+        kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
+
+        row = {
+            "Matchup": matchup,
+            "Tip (ET)": tip_short,
+            "Player": who,
+            "Market": {"player_points": "Points", "player_rebounds": "Rebounds",
+                       "player_assists": "Assists", "player_threes": "3PM"}[market_key],
+            "Market Key": market_key,
+            "Side": side,
+            "Line": float(line),
+            "FD Odds": int(fd_price),
+            "Best Gap (¢)": int(cents_delta),
+            "Best Book": best_other_book or "",
+            "Best Other": best_other_book or "",
+            "Other Odds": best_other_price if best_other_price is not None else "",
+            "Gap (¢)": int(cents_delta),
+            "Avg Gap (¢)": int(cents_delta_avg),
+            "Line Adv": round(adv, 2),
+            "Worse Line Ct": int(worse_ct),
+            "Books Used": int(books_used),
+            "Fair Prob %": round(market_prob * 100.0, 2),
+            "True Prob %": round(true_prob * 100.0, 2),
+            "EV %": ev_pct,
+            "Confidence": int(conf),
+            "Badge": badge,
+            "Kelly %": kelly_pct,
+            "Team Inj": "",
+            "Injury": inj_tag if inj_tag else "",
+            "Min Med / IQR": min_tag if min_tag else "",
+            "Adj Tags": adj_tags_str,
+            "Event ID": evt["id"],
+            "event_id": evt["id"],
+        }
+        out_rows.append(row)
+    return out_rows
+
+
+def _process_h2h_market(who: str, market_key: str, line: float, book_map: Dict[str, Dict[str, int]],
+                        ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Score one team's moneyline against the de-vigged consensus."""
+    (evt, matchup, tip_short, window_mode, min_books, trim_used, min_ev, require_ev, require_gap,
+     min_gap_cents, min_avg_gap_cents, min_true_prob_pct) = _common_ctx(ctx)
+    home_raw, away_raw = ctx["home"], ctx["away"]
+    prices, team_filter = ctx["prices"], ctx["team_filter"]
+
+    if FANDUEL_KEY not in book_map or "Win" not in book_map[FANDUEL_KEY]:
+        return []
+    fd_price = book_map[FANDUEL_KEY]["Win"]
+    opp = away_raw if who == home_raw else home_raw
+
+    # ✅ FIXED: Apply odds filter FIRST for moneyline
+    if window_mode == "pretip":
+        preset = WINDOW_PRESETS.get(window_mode, {})
+        if preset.get("mode") == "confidence":
+            fd_odds_min = preset.get("fd_odds_min", -999)
+            fd_odds_max = preset.get("fd_odds_max", 999)
+            if not (fd_odds_min <= fd_price <= fd_odds_max):
+                return []
+
+    fair_probs, fair_wgts = [], []
+    contributors = 0
+    opp_key = (opp, "h2h", 0.0)
+    opp_map = prices.get(opp_key, {})
+
+    for b, sides in book_map.items():
+        if b == FANDUEL_KEY:
+            continue
+        p_self = sides.get("Win")
+        p_opp = opp_map.get(b, {}).get("Win")
+        if p_self is None or p_opp is None:
+            continue
+        po = american_to_implied_prob(p_self)
+        qo = american_to_implied_prob(p_opp)
+        denom = po + qo
+        if denom <= 0:
+            continue
+        fair = po / denom
+        fair_probs.append(fair)
+        fair_wgts.append(book_weight(b))
+        contributors += 1
+
+    if contributors < max(2, min_books - 0):
+        return []
+
+    market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
+    if market_prob is None:
+        return []
+
+    _t, _o, _diff, bump = team_pressure_scores(who, opp, team_filter=team_filter)
+    true_prob = clamp(market_prob + bump * (WINDOW_PRESETS.get(window_mode, {}).get("ml_bump_scale", 1.0)), 0.0, 1.0)
+
+    cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap(book_map, "Win", fd_price)
+
+    edge_ok = True
+    if require_gap:
+        if window_mode == "morning":
+            edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
+        else:
+            edge_ok = (cents_delta >= min_gap_cents)
+
+    prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct) if min_true_prob_pct > 0 else True
+    fd_dec = american_to_decimal(fd_price)
+    ev_pct = round((true_prob * fd_dec - 1.0) * 100.0, 2)
+    ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
+
+    if not (edge_ok and prob_ok and ev_ok):
+        return []
+
+    conf, badge = confidence_score_from_prob(true_prob, inj_adj=0.0, min_adj=0.0, steam_adj=0.0)
+    if conf < min_true_prob_pct:
+        return []  # Skip bets below confidence threshold
+    k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
+    kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
+
+    row = {
+        "Matchup": matchup,
+        "Tip (ET)": tip_short,
+        "Player": who,
+        "Market": "Moneyline",
+        "Market Key": "h2h",
+        "Side": "Win",
+        "Line": 0.0,
+        "FD Odds": int(fd_price),
+        "Best Gap (¢)": int(cents_delta),
+        "Best Book": best_other_book or "",
+        "Best Other": best_other_book or "",
+        "Other Odds": best_other_price if best_other_price is not None else "",
+        "Gap (¢)": int(cents_delta),
+        "Avg Gap (¢)": int(cents_delta_avg),
+        "Line Adv": 0.0,
+        "Worse Line Ct": 0,
+        "Books Used": int(contributors),
+        "Fair Prob %": round(market_prob * 100.0, 2),
+        "True Prob %": round(true_prob * 100.0, 2),
+        "EV %": ev_pct,
+        "Confidence": int(conf),
+        "Badge": badge,
+        "Kelly %": kelly_pct,
+        "Team Inj": f"+{_t} / +{_o} (Δ{_diff:+d})" if (_t or _o) else "",
+        "Injury": "",
+        "Min Med / IQR": "",
+        "Adj Tags": "team-pressure" if abs(bump) > 1e-6 else "",
+        "Event ID": evt["id"],
+        "event_id": evt["id"],
+    }
+    return [row]
+
+
+def _process_spreads_market(who: str, market_key: str, line: float, book_map: Dict[str, Dict[str, int]],
+                            ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Score one team's spread, pairing each book with its nearest opposite line."""
+    (evt, matchup, tip_short, window_mode, min_books, trim_used, min_ev, require_ev, require_gap,
+     min_gap_cents, min_avg_gap_cents, min_true_prob_pct) = _common_ctx(ctx)
+    home_raw, away_raw = ctx["home"], ctx["away"]
+    prices, line_book_map, team_filter = ctx["prices"], ctx["line_book_map"], ctx["team_filter"]
+
+    if FANDUEL_KEY not in book_map or "Cover" not in book_map[FANDUEL_KEY]:
+        return []
+    fd_price = book_map[FANDUEL_KEY]["Cover"]
+    opp = away_raw if who == home_raw else home_raw
+
+    # ✅ FIXED: Apply odds filter FIRST for spreads
+    if window_mode == "pretip":
+        preset = WINDOW_PRESETS.get(window_mode, {})
+        if preset.get("mode") == "confidence":
+            fd_odds_min = preset.get("fd_odds_min", -999)
+            fd_odds_max = preset.get("fd_odds_max", 999)
+            if not (fd_odds_min <= fd_price <= fd_odds_max):
+                return []
+
+    fair_probs, fair_wgts = [], []
+    contributors = 0
+    opp_key = (opp, "spreads", -float(line))
+    opp_map_exact = prices.get(opp_key, {})
+
+    def _opp_price_for_book(bk: str) -> Optional[int]:
+        if bk in opp_map_exact and "Cover" in opp_map_exact[bk]:
+            return opp_map_exact[bk]["Cover"]
+        opp_family = {(t, m, ln): v for (t, m, ln), v in prices.items() if m == "spreads" and t == opp and abs(ln + float(line)) <= 0.5}
+        if not opp_family:
+            return None
+        m = None
+        for (t, mkey, ln), v in opp_family.items():
+            if bk in v and "Cover" in v[bk]:
+                if m is None or abs(ln + float(line)) < m[0]:
+                    m = (abs(ln + float(line)), v[bk]["Cover"])
+        return m[1] if m else None
+
+    for b, sides in book_map.items():
+        if b == FANDUEL_KEY:
+            continue
+        p_self = sides.get("Cover")
+        p_opp = _opp_price_for_book(b)
+        if p_self is None or p_opp is None:
+            continue
+        po = american_to_implied_prob(p_self)
+        qo = american_to_implied_prob(p_opp)
+        denom = po + qo
+        if denom <= 0:
+            continue
+        fair = po / denom
+        fair_probs.append(fair)
+        fair_wgts.append(book_weight(b))
+        contributors += 1
+
+    if contributors < min_books:
+        return []
+
+    market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
+    if market_prob is None:
+        return []
+
+    _t, _o, _diff, bump = team_pressure_scores(who, opp, team_filter=team_filter)
+    bump *= WINDOW_PRESETS.get(window_mode, {}).get("spread_bump_scale", 1.0)
+    true_prob = clamp(market_prob + bump, 0.0, 1.0)
+
+    lm_key = (who, "spreads")
+    other_lines = []
+    if lm_key in line_book_map:
+        for b, st in line_book_map[lm_key].items():
+            if b == FANDUEL_KEY or not st:
+                continue
+            try:
+                nearest = min(st, key=lambda L: abs(float(L) - float(line)))
+                other_lines.append(float(nearest))
+            except Exception:
+                pass
+    adv = line_advantage(float(line), other_lines, side="Cover")
+    worse_ct = count_worse_line(float(line), other_lines, side="Cover")
+
+    cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap(book_map, "Cover", fd_price)
+
+    edge_ok = True
+    if require_gap:
+        if window_mode == "morning":
+            edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
+        else:
+            edge_ok = (cents_delta >= min_gap_cents)
+    prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct) if min_true_prob_pct > 0 else True
+    fd_dec = american_to_decimal(fd_price)
+    ev_pct = round((true_prob * fd_dec - 1.0) * 100.0, 2)
+    ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
+
+    if not (edge_ok and prob_ok and ev_ok):
+        return []
+
+    conf, badge = confidence_score_from_prob(true_prob, inj_adj=0.0, min_adj=0.0, steam_adj=0.0)
+    if conf < min_true_prob_pct:
+        return []  # Skip bets below confidence threshold
+    k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
+    kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
+
+    row = {
+        "Matchup": matchup,
+        "Tip (ET)": tip_short,
+        "Player": who,
+        "Market": "Spread",
+        "Market Key": "spreads",
+        "Side": "Cover",
+        "Line": float(line),
+        "FD Odds": int(fd_price),
+        "Best Gap (¢)": int(cents_delta),
+        "Best Book": best_other_book or "",
+        "Best Other": best_other_book or "",
+        "Other Odds": best_other_price if best_other_price is not None else "",
+        "Gap (¢)": int(cents_delta),
+        "Avg Gap (¢)": int(cents_delta_avg),
+        "Line Adv": round(adv, 2),
+        "Worse Line Ct": int(worse_ct),
+        "Books Used": int(contributors),
+        "Fair Prob %": round(market_prob * 100.0, 2),
+        "True Prob %": round(true_prob * 100.0, 2),
+        "EV %": ev_pct,
+        "Confidence": int(conf),
+        "Badge": badge,
+        "Kelly %": kelly_pct,
+        "Team Inj": f"+{_t} / +{_o} (Δ{_diff:+d})" if (_t or _o) else "",
+        "Injury": "",
+        "Min Med / IQR": "",
+        "Adj Tags": "team-pressure" if abs(bump) > 1e-6 else "",
+        "Event ID": evt["id"],
+        "event_id": evt["id"],
+    }
+    return [row]
+
+
+def _process_totals_market(who: str, market_key: str, line: float, book_map: Dict[str, Dict[str, int]],
+                           ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Score both sides of one game total."""
+    (evt, matchup, tip_short, window_mode, min_books, trim_used, min_ev, require_ev, require_gap,
+     min_gap_cents, min_avg_gap_cents, min_true_prob_pct) = _common_ctx(ctx)
+
+    out_rows: List[Dict[str, Any]] = []
+    for side in ("Over", "Under"):
+        if FANDUEL_KEY not in book_map or side not in book_map[FANDUEL_KEY]:
+            continue
+        fd_price = book_map[FANDUEL_KEY][side]
+
+        # ✅ FIXED: Apply odds filter FIRST for totals
+        if window_mode == "pretip":
+            preset = WINDOW_PRESETS.get(window_mode, {})
+            if preset.get("mode") == "confidence":
+                fd_odds_min = preset.get("fd_odds_min", -999)
+                fd_odds_max = preset.get("fd_odds_max", 999)
+                if not (fd_odds_min <= fd_price <= fd_odds_max):
+                    continue
+
+        # Gap filter only needs the raw quotes, so run it before the consensus build
+        cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap(book_map, side, fd_price)
+
+        if require_gap:
+            if window_mode == "morning":
+                edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
+            else:
+                edge_ok = (cents_delta >= min_gap_cents)
+            if not edge_ok:
+                continue
+
+        fair_probs, fair_wgts = [], []
+        contributors = 0
+        for b, sides in book_map.items():
+            if b == FANDUEL_KEY:
+                continue
+            if "Over" in sides and "Under" in sides:
+                p_over = american_to_implied_prob(sides["Over"])
+                p_under = american_to_implied_prob(sides["Under"])
+                denom = p_over + p_under
+                if denom <= 0:
+                    continue
+                fair_over = p_over / denom
+                fair_probs.append(fair_over if side == "Over" else (1.0 - fair_over))
+                fair_wgts.append(book_weight(b))
+                contributors += 1
+
+        if contributors < min_books:
+            continue
+
+        market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
+        if market_prob is None:
+            continue
+
+        true_prob = market_prob
+
+        prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct) if min_true_prob_pct > 0 else True
+        fd_dec = american_to_decimal(fd_price)
+        ev_pct = round((true_prob * fd_dec - 1.0) * 100.0, 2)
+        ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
+
+        if not (prob_ok and ev_ok):
+            continue
+
+        conf, badge = confidence_score_from_prob(true_prob, inj_adj=0.0, min_adj=0.0, steam_adj=0.0)
+        if conf < min_true_prob_pct:
+            continue  # Skip bets below confidence threshold
+        k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
+        kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
+
+        row = {
+            "Matchup": matchup,
+            "Tip (ET)": tip_short,
+            "Player": "TOTAL",
+            "Market": "Total",
+            "Market Key": "totals",
+            "Side": side,
+            "Line": float(line),
+            "FD Odds": int(fd_price),
+            "Best Gap (¢)": int(cents_delta),
+            "Best Book": best_other_book or "",
+            "Best Other": best_other_book or "",
+            "Other Odds": best_other_price if best_other_price is not None else "",
+            "Gap (¢)": int(cents_delta),
+            "Avg Gap (¢)": int(cents_delta_avg),
+            "Line Adv": 0.0,
+            "Worse Line Ct": 0,
+            "Books Used": int(contributors),
+            "Fair Prob %": round(market_prob * 100.0, 2),
+            "True Prob %": round(true_prob * 100.0, 2),
+            "EV %": ev_pct,
+            "Confidence": int(conf),
+            "Badge": badge,
+            "Kelly %": kelly_pct,
+            "Team Inj": "",
+            "Injury": "",
+            "Min Med / IQR": "",
+            "Adj Tags": "",
+            "Event ID": evt["id"],
+            "event_id": evt["id"],
+        }
+        out_rows.append(row)
+    return out_rows
+
+
+# Per-market scorers; each event is fetched once and every price key is routed here
+_MARKET_HANDLERS = {
+    "player_points":   _process_props_market,
+    "player_rebounds": _process_props_market,
+    "player_assists":  _process_props_market,
+    "player_threes":   _process_props_market,
+    "h2h":             _process_h2h_market,
+    "spreads":         _process_spreads_market,
+    "totals":          _process_totals_market,
+}
+
+
 def _process_one_event(evt: Dict[str, Any], selected_markets: List[str],
                        min_books: int, trim_used: float,
                        ml_bump_scale: float, spread_bump_scale: float,
@@ -1760,661 +2408,22 @@ def _process_one_event(evt: Dict[str, Any], selected_markets: List[str],
                     pass
     if tick_rows: db_log_tick(tick_rows)
 
-    out_rows: List[Dict[str, Any]] = []
+    ctx = {
+        "evt": evt, "matchup": matchup, "tip_short": tip_short,
+        "home": home_raw, "away": away_raw,
+        "prices": prices, "line_book_map": line_book_map,
+        "min_books": min_books, "trim_used": trim_used, "min_ev": min_ev,
+        "window_mode": window_mode, "require_ev": require_ev, "require_gap": require_gap,
+        "min_gap_cents": min_gap_cents, "min_avg_gap_cents": min_avg_gap_cents,
+        "min_true_prob_pct": min_true_prob_pct, "steam_window_sec": steam_window_sec,
+        "team_filter": team_filter,
+    }
 
+    out_rows: List[Dict[str, Any]] = []
     for (who, market_key, line), book_map in prices.items():
-        def _best_and_avg_gap(fd_price: int, side_key: str) -> tuple[int, Optional[str], Optional[int], int]:
-            try:
-                fd_price_i = int(fd_price)
-            except Exception:
-                fd_price_i = fd_price
-            
-            # ✅ FIXED: Add sign filter back
-            fd_sign_positive = (fd_price_i >= 0)
-
-            best_other_book: Optional[str] = None
-            best_other_price: Optional[int] = None
-            others: List[int] = []
-
-            for b, sides in book_map.items():
-                if b == FANDUEL_KEY:
-                    continue
-                if side_key not in sides:
-                    continue
-                try:
-                    p = int(sides[side_key])
-                except Exception:
-                    continue
-
-                # ✅ FIXED: Skip opposite-sign quotes
-                if (p >= 0) != fd_sign_positive:
-                    continue
-
-                others.append(p)
-                if best_other_book is None or price_better_for_bettor(p, best_other_price):
-                    best_other_book, best_other_price = b, p
-
-            cents_delta_best = cents_diff(fd_price_i, best_other_price) if best_other_book else 0
-            cents_delta_avg = 0
-            if others:
-                avg_other = int(round(sum(others) / len(others)))
-                cents_delta_avg = cents_diff(fd_price_i, avg_other)
-
-            return cents_delta_best, best_other_book, best_other_price, cents_delta_avg
-
-        # ---------------------------- PROPS ----------------------------
-        if market_key in ("player_points","player_rebounds","player_assists","player_threes"):
-            for side in ("Over","Under"):
-                if FANDUEL_KEY not in book_map or side not in book_map[FANDUEL_KEY]:
-                    continue
-                fd_price = book_map[FANDUEL_KEY][side]
-
-                # ✅ FIXED: Apply odds filter FIRST for props
-                if window_mode in ("pretip", "plus_odds"):  # ✅ Add plus_odds
-                    preset = WINDOW_PRESETS.get(window_mode, {})
-                    mode = preset.get("mode")
-                    if mode in ("confidence", "plus_odds"):  # ✅ Add plus_odds
-                        fd_odds_min = preset.get("fd_odds_min", -999)
-                        fd_odds_max = preset.get("fd_odds_max", 999)
-                        if not (fd_odds_min <= fd_price <= fd_odds_max):
-                            continue
-
-                cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap(fd_price, side)
-
-                fair_probs: List[float] = []
-                fair_wgts:  List[float] = []
-                contributors_side_count = 0
-                for b, sides in book_map.items():
-                    if side in sides:
-                        contributors_side_count += 1
-                    if b == FANDUEL_KEY: 
-                        continue
-                    if "Over" in sides and "Under" in sides:
-                        p_over  = american_to_implied_prob(sides["Over"])
-                        p_under = american_to_implied_prob(sides["Under"])
-                        denom = p_over + p_under
-                        if denom > 0:
-                            fair_over  = p_over / denom
-                            fair_under = 1.0 - fair_over
-                            fair_probs.append(fair_over if side == "Over" else fair_under)
-                            fair_wgts.append(book_weight(b))
-                books_used = len(fair_probs)
-                if books_used < min_books:
-                    continue
-
-                market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
-                if market_prob is None:
-                    continue
-
-                if len(fair_probs) >= 4:
-                    qs = sorted(fair_probs); q = statistics.quantiles(qs, n=4)
-                    q1, q3 = q[0], q[2]; iqr = max(1e-6, q3-q1)
-                elif len(fair_probs) == 3:
-                    qs = sorted(fair_probs); iqr = max(1e-6, (qs[2]-qs[0]) * 0.5)
-                else:
-                    iqr = 0.20
-
-                stat_key = {"player_points":"pts","player_rebounds":"reb","player_assists":"ast","player_threes":"fg3m"}.get(market_key)
-                p_model = None
-                cv = 0.0
-
-                if stat_key:
-                    mean, stdev, cv = get_player_variance_stats(who, stat_key, n=10)
-                    
-                    if cv > 0.6:
-                        variance = stdev ** 2 if stdev > 0 else mean * 1.5
-                        p_model = negative_binomial_hit_prob(mean, variance, line, side)
-                        variance_penalty = min(0.15, cv * 0.1)
-                        p_model = p_model * (1 - variance_penalty)
-                    else:
-                        mu = rolling_player_mean(who, stat_key, n=10)
-                        p_model = poisson_hit_prob(mu, line, side)
-
-                true_prob = market_prob
-
-                if p_model is not None:
-                    if cv > 0.6:
-                        alpha_market = 0.90
-                    elif cv > 0.4:
-                        alpha_market = 0.85
-                    else:
-                        alpha_market = max(0.75, min(0.90, 0.90 - iqr/0.35))
-                    
-                    true_prob = alpha_market * market_prob + (1.0 - alpha_market) * p_model
-
-                p_lo, p_hi = min(fair_probs), max(fair_probs)
-                buffer = 0.05
-                true_prob = max(p_lo - buffer, min(p_hi + buffer, true_prob))
-                p_med = statistics.median(fair_probs)
-                true_prob = min(true_prob, p_med + 0.10)
-                true_prob = max(true_prob, p_med - 0.10)
-
-                lm_key = (who, market_key)
-                other_lines: List[float] = []
-                if lm_key in line_book_map:
-                    for b, st in line_book_map[lm_key].items():
-                        if b == FANDUEL_KEY: continue
-                        if not st: continue
-                        try:
-                            nearest = min(st, key=lambda L: abs(float(L) - float(line)))
-                            other_lines.append(float(nearest))
-                        except Exception:
-                            pass
-                adv = line_advantage(line, other_lines, side)
-                worse_ct = count_worse_line(line, other_lines, side)
-
-                # ✅ Calculate ALL adjustments BEFORE filtering
-                inj_adj, inj_tag = injury_confidence_adjust(who)
-                min_adj, min_tag = minutes_confidence_adjust(who)
-                steam_adj = steam_boost(evt["id"], who, market_key, line, side, window_sec=steam_window_sec)
-
-                alt_shape_bonus = 1.5 if (worse_ct >= 2 and adv > 0.25) else 0.0
-                
-                adj_tags_list = []
-                if inj_tag:
-                    adj_tags_list.append(inj_tag)
-                if min_tag:
-                    adj_tags_list.append(min_tag)
-                if steam_adj > 0:
-                    adj_tags_list.append("steam")
-                adj_tags_str = ",".join(adj_tags_list)
-
-                fd_dec = american_to_decimal(fd_price)
-                ev_val = true_prob * fd_dec - 1.0
-                ev_pct = round(ev_val * 100.0, 2)
-
-                # ✅ Now filter AFTER we have all adjustments
-                edge_ok = True
-                if require_gap:
-                    if window_mode == "morning":
-                        edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
-                    else:
-                        edge_ok = (cents_delta >= min_gap_cents)
-                prob_ok = True
-                if min_true_prob_pct > 0:
-                    prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct)
-                ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
-
-                if not (edge_ok and prob_ok and ev_ok):
-                    continue
-
-                # ✅ Calculate confidence WITH adjustments
-                if window_mode == "plus_odds":  # ✅ NEW
-                    conf, badge = plus_odds_confidence_score(
-                        true_prob, fd_price, cents_delta, books_used,
-                        inj_adj=inj_adj, min_adj=min_adj
-                    )
-                else:
-                    conf, badge = confidence_score_from_prob(
-                        true_prob, inj_adj=inj_adj, min_adj=min_adj, steam_adj=steam_adj
-                    )
-                    
-                if conf < min_true_prob_pct:
-                    continue  # Skip bets below confidence threshold
-
-                k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
-                kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
-
-                row = {
-                    "Matchup": matchup,
-                    "Tip (ET)": tip_short,
-                    "Player": who,
-                    "Market": {"player_points": "Points", "player_rebounds": "Rebounds",
-                               "player_assists": "Assists", "player_threes": "3PM"}[market_key],
-                    "Market Key": market_key,
-                    "Side": side,
-                    "Line": float(line),
-                    "FD Odds": int(fd_price),
-                    "Best Gap (¢)": int(cents_delta),
-                    "Best Book": best_other_book or "",
-                    "Best Other": best_other_book or "",
-                    "Other Odds": best_other_price if best_other_price is not None else "",
-                    "Gap (¢)": int(cents_delta),
-                    "Avg Gap (¢)": int(cents_delta_avg),
-                    "Line Adv": round(adv, 2),
-                    "Worse Line Ct": int(worse_ct),
-                    "Books Used": int(books_used),
-                    "Fair Prob %": round(market_prob * 100.0, 2),
-                    "True Prob %": round(true_prob * 100.0, 2),
-                    "EV %": ev_pct,
-                    "Confidence": int(conf),
-                    "Badge": badge,
-                    "Kelly %": kelly_pct,
-                    "Team Inj": "",
-                    "Injury": inj_tag if inj_tag else "",
-                    "Min Med / IQR": min_tag if min_tag else "",
-                    "Adj Tags": adj_tags_str,
-                    "Event ID": evt["id"],
-                    "event_id": evt["id"],
-                }
-                out_rows.append(row)
-
-        # ---------------------------- MONEYLINE ----------------------------
-        elif market_key == "h2h":
-            if FANDUEL_KEY not in book_map or "Win" not in book_map[FANDUEL_KEY]:
-                continue
-            fd_price = book_map[FANDUEL_KEY]["Win"]
-            opp = away_raw if who == home_raw else home_raw
-
-            # ✅ FIXED: Apply odds filter FIRST for moneyline
-            if window_mode == "pretip":
-                preset = WINDOW_PRESETS.get(window_mode, {})
-                if preset.get("mode") == "confidence":
-                    fd_odds_min = preset.get("fd_odds_min", -999)
-                    fd_odds_max = preset.get("fd_odds_max", 999)
-                    if not (fd_odds_min <= fd_price <= fd_odds_max):
-                        continue
-
-            fair_probs, fair_wgts = [], []
-            contributors = 0
-            opp_key = (opp, "h2h", 0.0)
-            opp_map = prices.get(opp_key, {})
-
-            for b, sides in book_map.items():
-                if b == FANDUEL_KEY:
-                    continue
-                p_self = sides.get("Win")
-                p_opp = opp_map.get(b, {}).get("Win")
-                if p_self is None or p_opp is None:
-                    continue
-                po = american_to_implied_prob(p_self)
-                qo = american_to_implied_prob(p_opp)
-                denom = po + qo
-                if denom <= 0:
-                    continue
-                fair = po / denom
-                fair_probs.append(fair)
-                fair_wgts.append(book_weight(b))
-                contributors += 1
-
-            if contributors < max(2, min_books - 0):
-                continue
-
-            market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
-            if market_prob is None:
-                continue
-
-            _t, _o, _diff, bump = team_pressure_scores(who, opp, team_filter=team_filter)
-            true_prob = clamp(market_prob + bump * (WINDOW_PRESETS.get(window_mode, {}).get("ml_bump_scale", 1.0)), 0.0, 1.0)
-
-            def _best_and_avg_gap_ml(fd_price_i: int) -> tuple[int, Optional[str], Optional[int], int]:
-                fd_sign_positive = (int(fd_price_i) >= 0)
-                
-                best_other_book = None
-                best_other_price = None
-                others = []
-                
-                for b, sides in book_map.items():
-                    if b == FANDUEL_KEY:
-                        continue
-                    if "Win" not in sides:
-                        continue
-                    try:
-                        p = int(sides["Win"])
-                    except Exception:
-                        continue
-                    
-                    if (p >= 0) != fd_sign_positive:
-                        continue
-                    
-                    others.append(p)
-                    if best_other_book is None or price_better_for_bettor(p, best_other_price):
-                        best_other_book, best_other_price = b, p
-                
-                cents_delta_best = cents_diff(int(fd_price_i), best_other_price) if best_other_book else 0
-                cents_delta_avg = 0
-                if others:
-                    avg_other = int(round(sum(others) / len(others)))
-                    cents_delta_avg = cents_diff(int(fd_price_i), avg_other)
-                
-                return cents_delta_best, best_other_book, best_other_price, cents_delta_avg
-
-            cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap_ml(fd_price)
-
-            edge_ok = True
-            if require_gap:
-                if window_mode == "morning":
-                    edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
-                else:
-                    edge_ok = (cents_delta >= min_gap_cents)
-
-            prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct) if min_true_prob_pct > 0 else True
-            fd_dec = american_to_decimal(fd_price)
-            ev_pct = round((true_prob * fd_dec - 1.0) * 100.0, 2)
-            ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
-            
-            if not (edge_ok and prob_ok and ev_ok):
-                continue
-
-            conf, badge = confidence_score_from_prob(true_prob, inj_adj=0.0, min_adj=0.0, steam_adj=0.0)
-            if conf < min_true_prob_pct:
-                continue  # Skip bets below confidence threshold
-            k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
-            kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
-
-            row = {
-                "Matchup": matchup,
-                "Tip (ET)": tip_short,
-                "Player": who,
-                "Market": "Moneyline",
-                "Market Key": "h2h",
-                "Side": "Win",
-                "Line": 0.0,
-                "FD Odds": int(fd_price),
-                "Best Gap (¢)": int(cents_delta),
-                "Best Book": best_other_book or "",
-                "Best Other": best_other_book or "",
-                "Other Odds": best_other_price if best_other_price is not None else "",
-                "Gap (¢)": int(cents_delta),
-                "Avg Gap (¢)": int(cents_delta_avg),
-                "Line Adv": 0.0,
-                "Worse Line Ct": 0,
-                "Books Used": int(contributors),
-                "Fair Prob %": round(market_prob * 100.0, 2),
-                "True Prob %": round(true_prob * 100.0, 2),
-                "EV %": ev_pct,
-                "Confidence": int(conf),
-                "Badge": badge,
-                "Kelly %": kelly_pct,
-                "Team Inj": f"+{_t} / +{_o} (Δ{_diff:+d})" if (_t or _o) else "",
-                "Injury": "",
-                "Min Med / IQR": "",
-                "Adj Tags": "team-pressure" if abs(bump) > 1e-6 else "",
-                "Event ID": evt["id"],
-                "event_id": evt["id"],
-            }
-            out_rows.append(row)
-
-        # ---------------------------- SPREADS ----------------------------
-        elif market_key == "spreads":
-            if FANDUEL_KEY not in book_map or "Cover" not in book_map[FANDUEL_KEY]:
-                continue
-            fd_price = book_map[FANDUEL_KEY]["Cover"]
-            opp = away_raw if who == home_raw else home_raw
-
-            # ✅ FIXED: Apply odds filter FIRST for spreads
-            if window_mode == "pretip":
-                preset = WINDOW_PRESETS.get(window_mode, {})
-                if preset.get("mode") == "confidence":
-                    fd_odds_min = preset.get("fd_odds_min", -999)
-                    fd_odds_max = preset.get("fd_odds_max", 999)
-                    if not (fd_odds_min <= fd_price <= fd_odds_max):
-                        continue
-
-            fair_probs, fair_wgts = [], []
-            contributors = 0
-            opp_key = (opp, "spreads", -float(line))
-            opp_map_exact = prices.get(opp_key, {})
-
-            def _opp_price_for_book(bk: str) -> Optional[int]:
-                if bk in opp_map_exact and "Cover" in opp_map_exact[bk]:
-                    return opp_map_exact[bk]["Cover"]
-                opp_family = {k: v for (t, m, ln), v in prices.items() if m == "spreads" and t == opp and abs(ln + float(line)) <= 0.5}
-                if not opp_family:
-                    return None
-                m = None
-                for (t, mkey, ln), v in opp_family.items():
-                    if bk in v and "Cover" in v[bk]:
-                        if m is None or abs(ln + float(line)) < m[0]:
-                            m = (abs(ln + float(line)), v[bk]["Cover"])
-                return m[1] if m else None
-
-            for b, sides in book_map.items():
-                if b == FANDUEL_KEY:
-                    continue
-                p_self = sides.get("Cover")
-                p_opp = _opp_price_for_book(b)
-                if p_self is None or p_opp is None:
-                    continue
-                po = american_to_implied_prob(p_self)
-                qo = american_to_implied_prob(p_opp)
-                denom = po + qo
-                if denom <= 0:
-                    continue
-                fair = po / denom
-                fair_probs.append(fair)
-                fair_wgts.append(book_weight(b))
-                contributors += 1
-
-            if contributors < min_books:
-                continue
-
-            market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
-            if market_prob is None:
-                continue
-
-            _t, _o, _diff, bump = team_pressure_scores(who, opp, team_filter=team_filter)
-            bump *= WINDOW_PRESETS.get(window_mode, {}).get("spread_bump_scale", 1.0)
-            true_prob = clamp(market_prob + bump, 0.0, 1.0)
-
-            lm_key = (who, "spreads")
-            other_lines = []
-            if lm_key in line_book_map:
-                for b, st in line_book_map[lm_key].items():
-                    if b == FANDUEL_KEY or not st:
-                        continue
-                    try:
-                        nearest = min(st, key=lambda L: abs(float(L) - float(line)))
-                        other_lines.append(float(nearest))
-                    except Exception:
-                        pass
-            adv = line_advantage(float(line), other_lines, side="Cover")
-            worse_ct = count_worse_line(float(line), other_lines, side="Cover")
-
-            def _best_and_avg_gap_sp(fd_price_i: int) -> tuple[int, Optional[str], Optional[int], int]:
-                fd_sign_positive = (int(fd_price_i) >= 0)
-                
-                best_other_book = None
-                best_other_price = None
-                others = []
-                
-                for b, sides in book_map.items():
-                    if b == FANDUEL_KEY:
-                        continue
-                    if "Cover" not in sides:
-                        continue
-                    try:
-                        p = int(sides["Cover"])
-                    except Exception:
-                        continue
-                    
-                    if (p >= 0) != fd_sign_positive:
-                        continue
-                    
-                    others.append(p)
-                    if best_other_book is None or price_better_for_bettor(p, best_other_price):
-                        best_other_book, best_other_price = b, p
-                
-                cents_delta_best = cents_diff(int(fd_price_i), best_other_price) if best_other_book else 0
-                cents_delta_avg = 0
-                if others:
-                    avg_other = int(round(sum(others) / len(others)))
-                    cents_delta_avg = cents_diff(int(fd_price_i), avg_other)
-                
-                return cents_delta_best, best_other_book, best_other_price, cents_delta_avg
-
-            cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap_sp(fd_price)
-
-            edge_ok = True
-            if require_gap:
-                if window_mode == "morning":
-                    edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
-                else:
-                    edge_ok = (cents_delta >= min_gap_cents)
-            prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct) if min_true_prob_pct > 0 else True
-            fd_dec = american_to_decimal(fd_price)
-            ev_pct = round((true_prob * fd_dec - 1.0) * 100.0, 2)
-            ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
-            
-            if not (edge_ok and prob_ok and ev_ok):
-                continue
-
-            conf, badge = confidence_score_from_prob(true_prob, inj_adj=0.0, min_adj=0.0, steam_adj=0.0)
-            if conf < min_true_prob_pct:
-                continue  # Skip bets below confidence threshold
-            k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
-            kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
-
-            row = {
-                "Matchup": matchup,
-                "Tip (ET)": tip_short,
-                "Player": who,
-                "Market": "Spread",
-                "Market Key": "spreads",
-                "Side": "Cover",
-                "Line": float(line),
-                "FD Odds": int(fd_price),
-                "Best Gap (¢)": int(cents_delta),
-                "Best Book": best_other_book or "",
-                "Best Other": best_other_book or "",
-                "Other Odds": best_other_price if best_other_price is not None else "",
-                "Gap (¢)": int(cents_delta),
-                "Avg Gap (¢)": int(cents_delta_avg),
-                "Line Adv": round(adv, 2),
-                "Worse Line Ct": int(worse_ct),
-                "Books Used": int(contributors),
-                "Fair Prob %": round(market_prob * 100.0, 2),
-                "True Prob %": round(true_prob * 100.0, 2),
-                "EV %": ev_pct,
-                "Confidence": int(conf),
-                "Badge": badge,
-                "Kelly %": kelly_pct,
-                "Team Inj": f"+{_t} / +{_o} (Δ{_diff:+d})" if (_t or _o) else "",
-                "Injury": "",
-                "Min Med / IQR": "",
-                "Adj Tags": "team-pressure" if abs(bump) > 1e-6 else "",
-                "Event ID": evt["id"],
-                "event_id": evt["id"],
-            }
-            out_rows.append(row)
-
-        # ---------------------------- TOTALS ----------------------------
-        elif market_key == "totals":
-            for side in ("Over", "Under"):
-                if FANDUEL_KEY not in book_map or side not in book_map[FANDUEL_KEY]:
-                    continue
-                fd_price = book_map[FANDUEL_KEY][side]
-
-                # ✅ FIXED: Apply odds filter FIRST for totals
-                if window_mode == "pretip":
-                    preset = WINDOW_PRESETS.get(window_mode, {})
-                    if preset.get("mode") == "confidence":
-                        fd_odds_min = preset.get("fd_odds_min", -999)
-                        fd_odds_max = preset.get("fd_odds_max", 999)
-                        if not (fd_odds_min <= fd_price <= fd_odds_max):
-                            continue
-
-                fair_probs, fair_wgts = [], []
-                contributors = 0
-                for b, sides in book_map.items():
-                    if b == FANDUEL_KEY:
-                        continue
-                    if "Over" in sides and "Under" in sides:
-                        p_over = american_to_implied_prob(sides["Over"])
-                        p_under = american_to_implied_prob(sides["Under"])
-                        denom = p_over + p_under
-                        if denom <= 0:
-                            continue
-                        fair_over = p_over / denom
-                        fair_probs.append(fair_over if side == "Over" else (1.0 - fair_over))
-                        fair_wgts.append(book_weight(b))
-                        contributors += 1
-
-                if contributors < min_books:
-                    continue
-
-                market_prob = trimmed_weighted_mean(fair_probs, fair_wgts, trim=trim_used)
-                if market_prob is None:
-                    continue
-
-                true_prob = market_prob
-
-                def _best_and_avg_gap_tot(fd_price_i: int) -> tuple[int, Optional[str], Optional[int], int]:
-                    fd_sign_positive = (int(fd_price_i) >= 0)
-                    
-                    best_other_book = None
-                    best_other_price = None
-                    others = []
-                    
-                    for b, sides in book_map.items():
-                        if b == FANDUEL_KEY:
-                            continue
-                        if side not in sides:
-                            continue
-                        try:
-                            p = int(sides[side])
-                        except Exception:
-                            continue
-                        
-                        if (p >= 0) != fd_sign_positive:
-                            continue
-                        
-                        others.append(p)
-                        if best_other_book is None or price_better_for_bettor(p, best_other_price):
-                            best_other_book, best_other_price = b, p
-                    
-                    cents_delta_best = cents_diff(int(fd_price_i), best_other_price) if best_other_book else 0
-                    cents_delta_avg = 0
-                    if others:
-                        avg_other = int(round(sum(others) / len(others)))
-                        cents_delta_avg = cents_diff(int(fd_price_i), avg_other)
-                    
-                    return cents_delta_best, best_other_book, best_other_price, cents_delta_avg
-
-                cents_delta, best_other_book, best_other_price, cents_delta_avg = _best_and_avg_gap_tot(fd_price)
-
-                edge_ok = True
-                if require_gap:
-                    if window_mode == "morning":
-                        edge_ok = (cents_delta >= min_gap_cents) and (cents_delta_avg >= min_avg_gap_cents)
-                    else:
-                        edge_ok = (cents_delta >= min_gap_cents)
-                prob_ok = (round(true_prob * 100.0, 2) >= min_true_prob_pct) if min_true_prob_pct > 0 else True
-                fd_dec = american_to_decimal(fd_price)
-                ev_pct = round((true_prob * fd_dec - 1.0) * 100.0, 2)
-                ev_ok = True if not require_ev else (ev_pct >= float(min_ev))
-                
-                if not (edge_ok and prob_ok and ev_ok):
-                    continue
-
-                conf, badge = confidence_score_from_prob(true_prob, inj_adj=0.0, min_adj=0.0, steam_adj=0.0)
-                if conf < min_true_prob_pct:
-                    continue  # Skip bets below confidence threshold
-                k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
-                kelly_pct = round(min(KELLY_CAP_PCT, max(0.0, k_frac * 100.0)), 2)
-
-                row = {
-                    "Matchup": matchup,
-                    "Tip (ET)": tip_short,
-                    "Player": "TOTAL",
-                    "Market": "Total",
-                    "Market Key": "totals",
-                    "Side": side,
-                    "Line": float(line),
-                    "FD Odds": int(fd_price),
-                    "Best Gap (¢)": int(cents_delta),
-                    "Best Book": best_other_book or "",
-                    "Best Other": best_other_book or "",
-                    "Other Odds": best_other_price if best_other_price is not None else "",
-                    "Gap (¢)": int(cents_delta),
-                    "Avg Gap (¢)": int(cents_delta_avg),
-                    "Line Adv": 0.0,
-                    "Worse Line Ct": 0,
-                    "Books Used": int(contributors),
-                    "Fair Prob %": round(market_prob * 100.0, 2),
-                    "True Prob %": round(true_prob * 100.0, 2),
-                    "EV %": ev_pct,
-                    "Confidence": int(conf),
-                    "Badge": badge,
-                    "Kelly %": kelly_pct,
-                    "Team Inj": "",
-                    "Injury": "",
-                    "Min Med / IQR": "",
-                    "Adj Tags": "",
-                    "Event ID": evt["id"],
-                    "event_id": evt["id"],
-                }
-                out_rows.append(row)
+        handler = _MARKET_HANDLERS.get(market_key)
+        if handler is not None:
+            out_rows.extend(handler(who, market_key, line, book_map, ctx))
 
     return out_rows, None
 
@@ -2535,8 +2544,21 @@ def scan_props(selected_markets: List[str], min_books: int, min_ev: float, bankr
     # Apply correlation flags/penalties
     pen_map, flag_map = correlation_penalty(candidates)
 
+    if candidates:  # Just debug the first row
+        r0 = candidates[0]
+        print("\n=== DEBUG: First candidate from _process_one_event ===")
+        print(f"Team Inj: '{r0.get('Team Inj')}'")
+        print(f"Injury: '{r0.get('Injury')}'")
+        print(f"Min Med / IQR: '{r0.get('Min Med / IQR')}'")
+        print(f"Adj Tags: '{r0.get('Adj Tags')}'")
+        print(f"Player: '{r0.get('Player')}'")
+        print(f"Market: '{r0.get('Market')}'")
+        print("===============================================\n")
+
+    # Loop invariants, resolved once per scan instead of once per row
+    kelly_mult = float(CURRENT_KELLY_MULT)
+
     final: List[Dict[str, Any]] = []
-    bets_to_log: List[tuple] = []
 
     for r in candidates:
         # Get correlation penalty for this bet
@@ -2544,60 +2566,31 @@ def scan_props(selected_markets: List[str], min_books: int, min_ev: float, bankr
         corr_pts = int(pen_map.get(k, 0))
         corr_flag = flag_map.get(k, "OK")
 
-        # Recalculate Kelly with correlation penalty
+        # Kelly with correlation haircut (Claude’s #8)
         try:
-            true_prob = float(r["True Prob %"]) / 100.0
+            p_true = float(r["True Prob %"]) / 100.0
             fd_dec = american_to_decimal(int(r["FD Odds"]))
         except Exception:
-            true_prob, fd_dec = 0.0, 1.0
+            p_true, fd_dec = 0.0, 1.0
 
-        # Apply correlation penalty to Kelly
-        k_frac = kelly_fraction(true_prob, fd_dec) * float(CURRENT_KELLY_MULT)
+        k_frac = kelly_fraction(p_true, fd_dec) * kelly_mult
         if not math.isfinite(k_frac) or k_frac < 0:
             k_frac = 0.0
-        
-        # Correlation haircut: each point ≈ 1% reduction, hard-capped at 50%
-        haircut = clamp(1.0 - (corr_pts / 100.0), 0.5, 1.0)
-        k_frac *= haircut
-        k_frac = min(k_frac, KELLY_CAP_PCT / 100.0)
+        # correlation haircut: each point ≈ 1% reduction, hard-capped at 50%
+        k_frac = min(k_frac * _HAIRCUT[min(corr_pts, 100)], _KELLY_CAP_FRAC)
         kelly_pct = round(k_frac * 100.0, 2)
-        
+
         # Update the Kelly % in the row with the correlation-adjusted value
         r["Kelly %"] = kelly_pct
         # Keys from _process_one_event
         # r has: "Badge","Confidence","Matchup","Tip (ET)","Player","Market","Side","Line",
         #        "FD Odds","Books Used","Fair Prob %","True Prob %","EV %","Best Book",
         #        "Best Gap (¢)","Avg Gap (¢)","Adj Tags","Event ID", ... (+optional per-market extras)
-        if len(final) == 0:  # Just debug the first row
-            print("\n=== DEBUG: First candidate from _process_one_event ===")
-            print(f"Team Inj: '{r.get('Team Inj')}'")
-            print(f"Injury: '{r.get('Injury')}'")
-            print(f"Min Med / IQR: '{r.get('Min Med / IQR')}'")
-            print(f"Adj Tags: '{r.get('Adj Tags')}'")
-            print(f"Player: '{r.get('Player')}'")
-            print(f"Market: '{r.get('Market')}'")
-            print("===============================================\n")
 
         # Respect the already-adjusted confidence/badge from _process_one_event
         score = int(r.get("Confidence", 0))
         badge = r.get("Badge", "PASS")
 
-        # Kelly with correlation haircut (Claude’s #8)
-        try:
-            p_true = float(r["True Prob %"]) / 100.0
-            fd_dec = american_to_decimal(int(r["FD Odds"]))
-        except Exception:
-            p_true, fd_dec = 0.0, 1.0
-
-        k_frac = kelly_fraction(p_true, fd_dec) * float(CURRENT_KELLY_MULT)
-        if not math.isfinite(k_frac) or k_frac < 0:
-            k_frac = 0.0
-        # correlation haircut: each point ≈ 1% reduction, hard-capped at 50%
-        haircut = clamp(1.0 - (corr_pts / 100.0), 0.5, 1.0)
-        k_frac *= haircut
-        k_frac = min(k_frac, KELLY_CAP_PCT / 100.0)
-        kelly_pct = round(k_frac * 100.0, 2)
-
         # Map fields to what the table/export expects
         fair_prob = float(r.get("Fair Prob %", 0.0)) / 100.0 if r.get("Fair Prob %") not in ("", None) else 0.0
         fair_american = implied_prob_to_american(fair_prob) if fair_prob > 0 else ""
@@ -2949,7 +2942,213 @@ def set_fullscreen(root, enabled: bool):
             pass
     root._is_fullscreen = bool(enabled)
 
+@functools.lru_cache(maxsize=8)
+def _brand_pil(text: str, height_px: int, font_path: Optional[str]):
+    """Build the wordmark as a PIL RGBA image. Cached: the font probe and drawing only run once."""
+    from PIL import ImageFont, ImageFilter
+
+    # ---------- font selection ----------
+    candidates = []
+    if font_path:
+        candidates.append(font_path)
+    candidates += [
+        os.getenv("BRAND_FONT_PATH", "").strip(),
+        os.path.join(os.path.dirname(__file__), "punk.ttf"),
+        os.path.join(os.path.dirname(__file__), "assets", "punk.ttf"),
+        # Windows fallbacks:
+        r"C:\Windows\Fonts\CHILLER.TTF",
+        r"C:\Windows\Fonts\IMPACT.TTF",
+        r"C:\Windows\Fonts\AGENCYB.TTF",
+        r"C:\Windows\Fonts\BAHNSCHRIFT.TTF",
+    ]
+    candidates = [p for p in candidates if p]
+
+    font = None
+    for fp in candidates:
+        try:
+            font = ImageFont.truetype(fp, size=height_px)
+            break
+        except Exception:
+            pass
+    if font is None:
+        try:
+            font = ImageFont.truetype("arialbd.ttf", size=height_px)
+        except Exception:
+            from PIL import ImageFont as IF
+            font = IF.load_default()
+
+    # ---------- sizing ----------
+    stroke_w = max(3, height_px // 18)
+    pad      = max(6, height_px // 10)
+
+    tmp = Image.new("L", (10, 10), 0)
+    td  = ImageDraw.Draw(tmp)
+    bbox = td.textbbox((0, 0), text, font=font, stroke_width=stroke_w)
+    tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    W, H = tw + pad * 2, th + pad * 2
+    y0   = (H - th) // 2
+
+    # ---------- layers ----------
+    stroke = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+    mask   = Image.new("L",   (W, H), 0)
+
+    # outline (BLACK)
+    sd = ImageDraw.Draw(stroke)
+    sd.text((pad, y0), text, font=font, fill=(0, 0, 0, 255),
+            stroke_width=stroke_w, stroke_fill=(0, 0, 0, 255))
+
+    # alpha mask (letter shapes only)
+    md = ImageDraw.Draw(mask)
+    md.text((pad, y0), text, font=font, fill=255)
+
+    # gradient fill (deep → cherry red)
+    c0 = (12, 0, 4)
+    c1 = (235, 16, 46)
+    col = []
+    for y in range(H):
+        t = y / max(1, H - 1)
+        t = t * 0.8 if t < 0.35 else 0.28 + (t - 0.35) * 0.85
+        col.append((int(c0[0] + (c1[0] - c0[0]) * t),
+                    int(c0[1] + (c1[1] - c0[1]) * t),
+                    int(c0[2] + (c1[2] - c0[2]) * t), 255))
+    # One 1px column stretched across, instead of a draw call per scanline
+    strip = Image.new("RGBA", (1, H))
+    strip.putdata(col)
+    fill = strip.resize((W, H), Image.NEAREST)
+    fill.putalpha(mask)
+
+    # subtle roughness
+    try:
+        # Max(3)->Min(3) is a closing that leaves solid glyph masks unchanged, so only the blur
+        # matters; scale it straight into a black layer's alpha (40/255 ink).
+        rough = mask.filter(ImageFilter.GaussianBlur(0.5)).point([v * 40 // 255 for v in range(256)])
+        rough_layer = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+        rough_layer.putalpha(rough)
+        stroke = Image.alpha_composite(stroke, rough_layer)
+    except Exception:
+        pass
+
+    return Image.alpha_composite(stroke, fill)
+
+
 # =================================== GUI ====================================
+_SORT_STRIP = str.maketrans("", "", "%+$Δ")  # decorations stripped before numeric column sorts
+
+_MSHORT_MAP = {
+    "player_points":"PTS","player_rebounds":"REB","player_assists":"AST","player_threes":"3PM",
+    "h2h":"ML","spreads":"SPREAD","totals":"TOTAL"
+}
+_MARKET_KEY_MAP = {
+    "Points": "player_points",
+    "Rebounds": "player_rebounds",
+    "Assists": "player_assists",
+    "3PM": "player_threes",
+    "Moneyline": "h2h",
+    "Spread": "spreads",
+    "Total": "totals"
+}
+
+_RENDERERS = {
+    "Moneyline": lambda r: f'{r["Player"]} ML',
+    "Spread":    lambda r: f'{r["Player"]} {float(r["Line"]):+g} SPREAD',
+    "Total":     lambda r: f'{r["Side"]} {r["Line"]} TOTAL',
+}
+# Parlay legs dispatch on the API market key
+_RENDERERS.update({"h2h": _RENDERERS["Moneyline"], "spreads": _RENDERERS["Spread"], "totals": _RENDERERS["Total"]})
+
+def _render_bet_text(r: Dict[str, Any], market: Optional[str] = None) -> str:
+    """The 'Bet' column text for a row; pass `market` to dispatch on an API key instead."""
+    fn = _RENDERERS.get(r["Market"] if market is None else market)
+    if fn is not None:
+        return fn(r)
+    if market is None:
+        mshort = _MSHORT_MAP.get(r.get("Market Key", r["Market"]), r["Market"])
+    else:
+        mshort = _MSHORT_MAP.get(market, market)
+    side_symbol = "o" if r["Side"] == "Over" else "u"
+    return f'{r["Player"]} {side_symbol}{r["Line"]} {mshort}'
+
+def _row_move_key(r: Dict[str, Any]) -> tuple:
+    """(event_id, player, API market key, line, side) for last_10min_moves()."""
+    return (r.get("event_id","") or r.get("Event ID",""),
+            r["Player"],
+            _MARKET_KEY_MAP.get(r["Market"], r.get("Market Key", "")),  # ✅ Use API key
+            float(r["Line"]),
+            r["Side"])
+
+_INJURY_WORDS = frozenset({"out", "doubtful", "q/gtd", "probable"})
+_MIN_TAG_RE = re.compile(r"\d+(?:\.\d+)?/\d+(?:\.\d+)?")  # minutes tag like "30.1/4.2(n=7)"
+
+def _parse_adj_tags(r: Dict[str, Any]):
+    """Fill r["_injury"] / r["_min_med_iqr"], falling back to Adj Tags when the columns are blank."""
+    injury_status = r.get("Injury", "")
+    min_med_iqr = r.get("Min Med / IQR", "")
+    if (not injury_status or not min_med_iqr) and r.get("Adj Tags"):
+        for t in str(r["Adj Tags"]).split(","):
+            t = t.strip()
+            if not t:
+                continue
+            if _MIN_TAG_RE.match(t):
+                if not min_med_iqr:
+                    min_med_iqr = t
+            elif t.lower() in _INJURY_WORDS:
+                if not injury_status:
+                    injury_status = t
+    r["_injury"] = injury_status
+    r["_min_med_iqr"] = min_med_iqr
+
+@functools.lru_cache(maxsize=2048)
+def _fmt_signed(n: int) -> str:
+    """American odds with an explicit sign; FD prices cluster on a few values."""
+    return f"+{n}" if n >= 0 else str(n)
+
+def _csv_int(v):
+    """Odds columns go out as ints; blanks and unparseable values pass through unchanged."""
+    if type(v) is int:
+        return v
+    if type(v) is float and math.isfinite(v):
+        return int(v)
+    if v == "":
+        return v
+    try:
+        return int(v)
+    except Exception:
+        return v
+
+def _reconcile_ev(rows: List[Dict[str, Any]]):
+    """Recompute EV % from FD odds and true prob in one pass; overwrite rows that drifted > 1pt."""
+    for r in rows:
+        try:
+            fd_dec = american_to_decimal(int(r["FD Odds"]))
+            ev_check = round((float(r["True Prob %"]) / 100.0 * fd_dec - 1.0) * 100.0, 2)
+            if abs(float(r["EV %"]) - ev_check) > 1.0:
+                r["EV %"] = ev_check
+        except Exception:
+            pass
+
+# Background art lookup tables (0..255 in -> value out), built once for Image.point()
+def _bg_luts():
+    c0 = (12, 0, 4)      # very deep red (almost black-red)
+    c1 = (235, 16, 46)   # candy cherry red (barely reached)
+    rgb = []
+    for ch in range(3):
+        rgb += [int(c0[ch] + (c1[ch] - c0[ch]) * (i / 255.0) ** 1.8) for i in range(256)]  # dark-biased
+
+    # vignette: input is distance / (2*max_d)
+    vignette_strength = 0.35
+    vig = [int(round(255 * max(0.65, min(1.0, 1.0 - vignette_strength * min(1.0, 2 * i / 255.0) ** 1.25))))
+           for i in range(256)]
+
+    # gloss: stretched to (2rx, 2ry), the radial gradient reads 255*r/sqrt2 for elliptical radius r
+    max_alpha = 90
+    gloss = []
+    for i in range(256):
+        r2 = (i * math.sqrt(2) / 255.0) ** 2
+        gloss.append(int(max_alpha * (1.0 - r2) ** 1.8) if r2 <= 1.0 else 0)
+    return rgb, vig, gloss
+
+_BG_RGB_LUT, _BG_VIGNETTE_LUT, _BG_GLOSS_LUT = _bg_luts()
+
 class App:
     def __init__(self, root):
         self.root = root
@@ -2969,11 +3168,24 @@ class App:
         )
 
         self._bg_img = None
+        self._bg_item = None  # canvas image item id, created once
+        # (w>>3, h>>3) -> PhotoImage; a full-screen image is ~8 MB of Tk memory, so keep only
+        # the current size and the previous one (e.g. toggling fullscreen back and forth)
+        self._grad_cache: Dict[Tuple[int, int], Any] = {}
+        self._resize_after = None  # pending after() id for the debounced gradient render
+        self._bg_pool = ThreadPoolExecutor(max_workers=1)  # off-Tk-thread PIL renders
+        self._bg_future = None
+        self._bg_gen = 0  # bumped per render request; stale results are dropped
         self.canvas.bind("<Configure>", self._on_resize)
 
         self.work_q = queue.Queue()
         self.worker = None
         self.current_rows = []
+        self._badge_tags: Dict[str, Tuple[str, str]] = {}  # badge -> (fg tag, bg tag)
+        self._moves: Dict[tuple, tuple] = {}  # _row_move_key -> (fd bps, sharp bps) for the loaded rows
+        self._pending_rows: List[Dict[str, Any]] = []  # rows still queued for _drain_rows
+        self._pending_pos = 0
+        self._drain_after = None
         self.bankroll_cache = DEFAULT_BANKROLL
 
         # state
@@ -3020,84 +3232,103 @@ class App:
         except Exception:
             pass
 
+        # Drag-resizes fire <Configure> in bursts; only render once they settle
+        if self._resize_after:
+            self.canvas.after_cancel(self._resize_after)
+        self._resize_after = self.canvas.after(40, self._render_gradient_deferred, w, h)
+
+    def _render_gradient_deferred(self, w, h):
+        self._resize_after = None
         self._render_gradient(w, h)
 
-    def _render_gradient(self, w, h):
+    def _build_gradient_image(self, w, h):
         # Deep-to-cherry red, mostly dark, subtle vignette + glossy highlight.
+        # Smooth, low-frequency art: render small and let a cheap bilinear upscale fill the canvas
+        base = 256
+        gw = max(64, min(base, w))
+        gh = max(64, min(base, h))
+
+        # Diagonal ramp t = 0.55*x + 0.45*(1-y), built from PIL's 0..255 gradient
+        # so the per-pixel work stays in C; easing + color mix go through _BG_RGB_LUT.
+        ramp = Image.linear_gradient("L")
+        tx = ramp.transpose(Image.ROTATE_90).resize((gw, gh), Image.BILINEAR)
+        ty = ramp.transpose(Image.FLIP_TOP_BOTTOM).resize((gw, gh), Image.BILINEAR)
+        t = Image.blend(ty, tx, 0.55)
+
+        img = Image.merge("RGB", (t, t, t)).point(_BG_RGB_LUT)
+
+        # Vignette
+        cx, cy = gw * 0.5, gh * 0.5
+        max_d = (cx**2 + cy**2) ** 0.5
+        # PIL's radial gradient reads 255 at its corners (radius 128*sqrt2); sample it so
+        # 255 lands at 2*max_d, keeping every target pixel inside the source square.
+        s = (128 * math.sqrt(2)) / (2 * max_d)
+        dist = Image.radial_gradient("L").resize(
+            (gw, gh), Image.BILINEAR, box=(128 - cx * s, 128 - cy * s, 128 + cx * s, 128 + cy * s))
+        vig = dist.point(_BG_VIGNETTE_LUT)
+        img = ImageChops.multiply(img, Image.merge("RGB", (vig, vig, vig)))
+
+        # Gloss highlight (elliptical)
+        mask = Image.new("L", (gw, gh), 0)
+
+        gx, gy = int(gw * 0.35), int(gh * 0.22)
+        rx, ry = gw * 0.48, gh * 0.36
+        spot = Image.radial_gradient("L").resize((max(1, round(2 * rx)), max(1, round(2 * ry))), Image.BILINEAR)
+        mask.paste(spot.point(_BG_GLOSS_LUT), (round(gx - rx), round(gy - ry)))
+
+        # White composited over transparent black comes out as grey=alpha, so pasting the mask
+        # through itself reproduces the old overlay + alpha_composite in one pass
+        img.paste(Image.merge("RGB", (mask, mask, mask)), mask=mask)
+
+        # Upscale to canvas
+        return img.resize((max(1, w), max(1, h)), Image.BILINEAR)
+
+    def _render_gradient(self, w, h):
         if HAS_PIL:
-            c0 = (12, 0, 4)      # very deep red (almost black-red)
-            c1 = (235, 16, 46)   # candy cherry red (barely reached)
-
-            base = 420
-            gw = max(64, min(base, w))
-            gh = max(64, min(base, h))
-
-            img = Image.new("RGB", (gw, gh))
-            px = img.load()
-
-            def ease(t: float) -> float:
-                return max(0.0, min(1.0, t ** 1.8))  # dark-biased
-
-            for y in range(gh):
-                vy = 1.0 - (y / (gh - 1))
-                for x in range(gw):
-                    vx = (x / (gw - 1))
-                    t = 0.55 * vx + 0.45 * vy
-                    t = ease(t)
-                    r = int(c0[0] + (c1[0] - c0[0]) * t)
-                    g = int(c0[1] + (c1[1] - c0[1]) * t)
-                    b = int(c0[2] + (c1[2] - c0[2]) * t)
-                    px[x, y] = (r, g, b)
-
-            # Vignette
-            vignette_strength = 0.35
-            cx, cy = gw * 0.5, gh * 0.5
-            max_d = (cx**2 + cy**2) ** 0.5
-            px = img.load()
-            for y in range(gh):
-                for x in range(gw):
-                    dx = (x - cx)
-                    dy = (y - cy)
-                    d = (dx*dx + dy*dy) ** 0.5
-                    v = 1.0 - vignette_strength * (d / max_d) ** 1.25
-                    v = max(0.65, min(1.0, v))
-                    r, g, b = px[x, y]
-                    px[x, y] = (int(r * v), int(g * v), int(b * v))
-
-            # Convert for compositing
-            img = img.convert("RGBA")
-
-            # Gloss highlight (elliptical)
-            gloss = Image.new("RGBA", (gw, gh), (255, 255, 255, 0))
-            mask = Image.new("L", (gw, gh), 0)
-            mpx = mask.load()
-
-            gx, gy = int(gw * 0.35), int(gh * 0.22)
-            rx, ry = gw * 0.48, gh * 0.36
-            max_alpha = 90
-            for y in range(gh):
-                for x in range(gw):
-                    nx = (x - gx) / rx
-                    ny = (y - gy) / ry
-                    r2 = nx*nx + ny*ny
-                    if r2 <= 1.0:
-                        a = int(max_alpha * (1.0 - r2) ** 1.8)
-                        mpx[x, y] = max(mpx[x, y], a)
-
-            gloss_overlay = Image.new("RGBA", (gw, gh), (255, 255, 255, 255))
-            img = Image.alpha_composite(img, Image.composite(gloss_overlay, Image.new("RGBA", (gw, gh), (0, 0, 0, 0)), mask))
-
-            # Upscale to canvas
-            img = img.resize((max(1, w), max(1, h)), Image.LANCZOS)
-
-            self._bg_img = ImageTk.PhotoImage(img)
-            self.canvas.delete("bgimg")
-            self.canvas.create_image(0, 0, anchor="nw", image=self._bg_img, tags="bgimg")
-            self.canvas.lower("bgimg")
+            # Resize drags revisit the same sizes; snap up to an 8px grid and reuse the PhotoImage
+            key = ((w + 7) >> 3, (h + 7) >> 3)
+            self._bg_gen += 1  # any build still in flight is now stale
+            photo = self._grad_cache.get(key)
+            if photo is not None:
+                self._install_bg(photo)
+                return
+
+            # PIL work runs on the render thread; the PhotoImage must be made on the Tk thread
+            if self._bg_future is not None:
+                self._bg_future.cancel()
+            self._bg_future = self._bg_pool.submit(self._build_gradient_image, key[0] << 3, key[1] << 3)
+            self.canvas.after(15, self._poll_bg, self._bg_future, key, self._bg_gen)
+        elif self._bg_item is None:
+            self._bg_item = self.canvas.create_rectangle(0, 0, w, h, fill="#0a0002", outline="", tags="bgrect")
+            self.canvas.lower(self._bg_item)
+        else:
+            self.canvas.coords(self._bg_item, 0, 0, w, h)
+
+    def _poll_bg(self, fut, key, gen):
+        if gen != self._bg_gen:
+            return  # superseded by a newer resize
+        if not fut.done():
+            self.canvas.after(15, self._poll_bg, fut, key, gen)
+            return
+        try:
+            img = fut.result()
+        except Exception as e:
+            print(f"[BG] gradient render failed: {e}")
+            return
+        photo = ImageTk.PhotoImage(img)
+        if len(self._grad_cache) >= 2:
+            self._grad_cache.pop(next(iter(self._grad_cache)))  # FIFO evict
+        self._grad_cache[key] = photo
+        self._install_bg(photo)
+
+    def _install_bg(self, photo):
+        self._bg_img = photo
+        # Keep one canvas item and swap its image; delete+create flickers on every resize
+        if self._bg_item is None:
+            self._bg_item = self.canvas.create_image(0, 0, anchor="nw", image=self._bg_img, tags="bgimg")
+            self.canvas.lower(self._bg_item)
         else:
-            self.canvas.delete("bgrect")
-            self.canvas.create_rectangle(0, 0, w, h, fill="#0a0002", outline="", tags="bgrect")
-            self.canvas.lower("bgrect")
+            self.canvas.itemconfigure(self._bg_item, image=self._bg_img)
 
     def _render_brand_image(self, text="NAO'S BETTOR", height_px=84, font_path=None):
         """
@@ -3109,88 +3340,8 @@ class App:
         """
         if not HAS_PIL:
             return None
-
-        from PIL import Image, ImageDraw, ImageFont, ImageTk, ImageFilter
-
-        # ---------- font selection ----------
-        candidates = []
-        if font_path:
-            candidates.append(font_path)
-        candidates += [
-            os.getenv("BRAND_FONT_PATH", "").strip(),
-            os.path.join(os.path.dirname(__file__), "punk.ttf"),
-            os.path.join(os.path.dirname(__file__), "assets", "punk.ttf"),
-            # Windows fallbacks:
-            r"C:\Windows\Fonts\CHILLER.TTF",
-            r"C:\Windows\Fonts\IMPACT.TTF",
-            r"C:\Windows\Fonts\AGENCYB.TTF",
-            r"C:\Windows\Fonts\BAHNSCHRIFT.TTF",
-        ]
-        candidates = [p for p in candidates if p]
-
-        font = None
-        for fp in candidates:
-            try:
-                font = ImageFont.truetype(fp, size=height_px)
-                break
-            except Exception:
-                pass
-        if font is None:
-            try:
-                font = ImageFont.truetype("arialbd.ttf", size=height_px)
-            except Exception:
-                from PIL import ImageFont as IF
-                font = IF.load_default()
-
-        # ---------- sizing ----------
-        stroke_w = max(3, height_px // 18)
-        pad      = max(6, height_px // 10)
-
-        tmp = Image.new("L", (10, 10), 0)
-        td  = ImageDraw.Draw(tmp)
-        bbox = td.textbbox((0, 0), text, font=font, stroke_width=stroke_w)
-        tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
-        W, H = tw + pad * 2, th + pad * 2
-        y0   = (H - th) // 2
-
-        # ---------- layers ----------
-        stroke = Image.new("RGBA", (W, H), (0, 0, 0, 0))
-        fill   = Image.new("RGBA", (W, H), (0, 0, 0, 0))
-        mask   = Image.new("L",   (W, H), 0)
-
-        # outline (BLACK)
-        sd = ImageDraw.Draw(stroke)
-        sd.text((pad, y0), text, font=font, fill=(0, 0, 0, 255),
-                stroke_width=stroke_w, stroke_fill=(0, 0, 0, 255))
-
-        # alpha mask (letter shapes only)
-        md = ImageDraw.Draw(mask)
-        md.text((pad, y0), text, font=font, fill=255)
-
-        # gradient fill (deep → cherry red)
-        c0 = (12, 0, 4)
-        c1 = (235, 16, 46)
-        gd = ImageDraw.Draw(fill)
-        for y in range(H):
-            t = y / max(1, H - 1)
-            t = t * 0.8 if t < 0.35 else 0.28 + (t - 0.35) * 0.85
-            r = int(c0[0] + (c1[0] - c0[0]) * t)
-            g = int(c0[1] + (c1[1] - c0[1]) * t)
-            b = int(c0[2] + (c1[2] - c0[2]) * t)
-            gd.line([(0, y), (W, y)], fill=(r, g, b, 255))
-        fill.putalpha(mask)
-
-        # subtle roughness
-        try:
-            rough = mask.filter(ImageFilter.MaxFilter(3)).filter(ImageFilter.MinFilter(3)).filter(ImageFilter.GaussianBlur(0.5))
-            rough_layer = Image.new("RGBA", (W, H), (0, 0, 0, 0))
-            ImageDraw.Draw(rough_layer).bitmap((0, 0), rough, fill=(0, 0, 0, 40))
-            stroke = Image.alpha_composite(stroke, rough_layer)
-        except Exception:
-            pass
-
-        out = Image.alpha_composite(stroke, fill)
-        return ImageTk.PhotoImage(out)
+        # PhotoImage is bound to a Tk root, so only the PIL image is shared
+        return ImageTk.PhotoImage(_brand_pil(text, height_px, font_path))
     
         # -------- Weights dialog (AI-CHANGE 2025-11-09) --------
     def on_weights(self):
@@ -3201,8 +3352,6 @@ class App:
           • Values are floats (e.g., 0.5, 1.0, 1.5). Invalid inputs revert to 1.0.
           • Saved to weights.json and applied immediately.
         """
-        global BOOK_WEIGHTS
-
         top = tk.Toplevel(self.frame)
         top.title("Book Weights")
         frm = ttk.Frame(top, padding=12)
@@ -3268,7 +3417,7 @@ class App:
             # Keep as dict; propagate to global and save file
             try:
                 save_book_weights(new_map)
-                BOOK_WEIGHTS = new_map
+                set_book_weights(new_map)
                 self.set_status("Book weights saved.")
             except Exception as e:
                 self.set_status(f"Could not save weights: {e}")
@@ -3291,20 +3440,19 @@ class App:
         center = ttk.Frame(bar);  center.pack(side="left", expand=True, fill="x")
         right  = ttk.Frame(bar);  right.pack(side="right")
 
+        sec = "secondary" if use_bootstrap else None
+        dng = "danger" if use_bootstrap else None
+
         # Left controls
-        ttk.Button(left, text="Markets…",  bootstyle=("secondary" if use_bootstrap else None),
-                command=self._open_markets_dialog).pack(side="left", padx=6)
-        ttk.Button(left, text="Filters…",  bootstyle=("secondary" if use_bootstrap else None),
-                command=self._open_filters_dialog).pack(side="left", padx=6)
-        ttk.Button(left, text="Bankroll…", bootstyle=("secondary" if use_bootstrap else None),
-                command=self._open_bankroll_dialog).pack(side="left", padx=6)
-        ttk.Button(left, text="Limits…",   bootstyle=("secondary" if use_bootstrap else None),
-                command=self._open_limits_dialog).pack(side="left", padx=6)
-
-        # AI-CHANGE: Teams filter button
-        ttk.Button(left, text="Teams…",
-                   bootstyle=("secondary" if use_bootstrap else None),
-                   command=self._open_teams_dialog).pack(side="left", padx=6)  # AI-CHANGE
+        left_btns = (
+            ("Markets…",  self._open_markets_dialog),
+            ("Filters…",  self._open_filters_dialog),
+            ("Bankroll…", self._open_bankroll_dialog),
+            ("Limits…",   self._open_limits_dialog),
+            ("Teams…",    self._open_teams_dialog),  # AI-CHANGE: Teams filter button
+        )
+        for txt, cmd in left_btns:
+            ttk.Button(left, text=txt, bootstyle=sec, command=cmd).pack(side="left", padx=6)
 
         ttk.Label(left, text="Betting Window").pack(side="left", padx=(12, 6))
         self.window_combo = ttk.Combobox(left, width=20, state="readonly",
@@ -3320,26 +3468,16 @@ class App:
             ttk.Label(center, text="NAO'S BETTOR", font=("Segoe UI", 16, "bold")).pack(expand=True, pady=0)
 
         # Right actions
-        ttk.Button(right, text="Weights…", bootstyle=("secondary" if use_bootstrap else None),
-                command=self.on_weights).pack(side="left", padx=6)
-        self.search_btn = ttk.Button(right, text="Search",
-                                    bootstyle=("danger" if use_bootstrap else None),
-                                    command=self.on_search)
+        ttk.Button(right, text="Weights…", bootstyle=sec, command=self.on_weights).pack(side="left", padx=6)
+        self.search_btn = ttk.Button(right, text="Search", bootstyle=dng, command=self.on_search)
         self.search_btn.pack(side="left", padx=6)
-        self.export_btn = ttk.Button(right, text="Export CSV",
-                                    bootstyle=("danger" if use_bootstrap else None),
+        self.export_btn = ttk.Button(right, text="Export CSV", bootstyle=dng,
                                     state="disabled", command=self.on_export)
         self.export_btn.pack(side="left", padx=6)
-        ttk.Button(right, text="Quit",
-                bootstyle=("danger" if use_bootstrap else None),
-                command=self.on_quit).pack(side="left", padx=6)
-        
+        ttk.Button(right, text="Quit", bootstyle=dng, command=self.on_quit).pack(side="left", padx=6)
+
         # AI-CHANGE: Build Parlays from selected bets
-        self.parlay_btn = ttk.Button(
-            right, text="Parlays…",
-            bootstyle=("danger" if use_bootstrap else None),
-            command=self.on_build_parlays
-        )
+        self.parlay_btn = ttk.Button(right, text="Parlays…", bootstyle=dng, command=self.on_build_parlays)
         self.parlay_btn.pack(side="left", padx=6)
 
 
@@ -3517,6 +3655,7 @@ class App:
         cols = ["Badge","Conf (Hit%)","Corr","Bet","FD","Fair","True %","EV %","Kelly %","Kelly $",
                 "Move(10m)","Team Inj","Injury","Min Med / IQR","Best Other","Other","Gap¢","Books","Matchup","Tip"]
         self.tree = ttk.Treeview(parent, columns=cols, show="headings", height=18)
+        self._tree_path = str(self.tree)  # Tcl widget path for direct insert calls
         widths = [70,90,60,300,70,80,70,70,70,80,110,100,90,110,100,80,60,70,220,80]
         anchors = ["center","center","center","w","center","center","center","center","center","center",
                    "center","center","center","center","center","center","center","center","w","center"]
@@ -3558,12 +3697,17 @@ class App:
 
     # -------- Helpers --------
     def _sort_by(self, col, descending):
-        data = [(self.tree.set(k, col), k) for k in self.tree.get_children("")]
-        def try_num(s):
-            try: return float(str(s).replace("%","").replace("+","").replace("$","").replace("Δ",""))
-            except: return s
-        data.sort(key=lambda t: try_num(t[0]), reverse=descending)
-        for idx, item in enumerate(data):
+        data = [(str(self.tree.set(k, col)), k) for k in self.tree.get_children("")]
+        # Decide once per column: numeric if every non-empty cell parses, else plain string sort
+        keyed = []
+        try:
+            for v, k in data:
+                v = v.translate(_SORT_STRIP)
+                keyed.append((float(v) if v else float("-inf"), k))
+        except ValueError:
+            keyed = data
+        keyed.sort(key=operator.itemgetter(0), reverse=descending)
+        for idx, item in enumerate(keyed):
             self.tree.move(item[1], "", idx)
         self.tree.heading(col, command=lambda: self._sort_by(col, not descending))
 
@@ -3675,160 +3819,94 @@ class App:
         for child in self.tree.get_children(""): 
             self.tree.delete(child)
         self.current_rows = rows
-        
+        _reconcile_ev(rows)
+        for r in rows:
+            _parse_adj_tags(r)
+
+        # Tick movement for every row in one DB session instead of a connection per row
+        move_keys = []
         for r in rows:
             try:
-                fd_odds  = int(r["FD Odds"])
-                true_p   = float(r["True Prob %"]) / 100.0
-                fd_dec   = american_to_decimal(fd_odds)
-                ev_check = round((true_p * fd_dec - 1.0) * 100.0, 2)
-                if abs(float(r["EV %"]) - ev_check) > 1.0:
-                    r["EV %"] = ev_check
+                move_keys.append(_row_move_key(r))
             except Exception:
                 pass
+        self._moves = last_10min_moves(move_keys)
+
+        # Insert in batches from the event loop so a big result set doesn't freeze the UI
+        if self._drain_after is not None:
+            self.frame.after_cancel(self._drain_after)
+            self._drain_after = None
+        self._pending_rows = list(rows)
+        self._pending_pos = 0
+        self._drain_rows()
+
+    def _drain_rows(self, batch: int = 50):
+        end = min(self._pending_pos + batch, len(self._pending_rows))
+        for i in range(self._pending_pos, end):
+            self._insert_row(self._pending_rows[i], i)
+        self._pending_pos = end
+        if end < len(self._pending_rows):
+            self._drain_after = self.frame.after(0, self._drain_rows)
+        else:
+            self._drain_after = None
+            self._pending_rows = []
 
-            mshort_map = {
-                "player_points":"PTS","player_rebounds":"REB","player_assists":"AST","player_threes":"3PM",
-                "h2h":"ML","spreads":"SPREAD","totals":"TOTAL"
-            }
-            mshort = mshort_map.get(r.get("Market Key", r["Market"]), r["Market"])
-
-            if r["Market"] == "Moneyline":
-                bet = f'{r["Player"]} ML'
-            elif r["Market"] == "Spread":
-                bet = f'{r["Player"]} {float(r["Line"]):+g} SPREAD'
-            elif r["Market"] == "Total":
-                bet = f'{r["Side"]} {r["Line"]} TOTAL'
-            else:
-                side_symbol = "o" if r["Side"] == "Over" else "u"
-                bet = f'{r["Player"]} {side_symbol}{r["Line"]} {mshort}'
-
-            kelly_dollars = round(self.bankroll_cache * (r["Kelly %"]/100.0), 2)
-            market_key_map = {
-                "Points": "player_points",
-                "Rebounds": "player_rebounds", 
-                "Assists": "player_assists",
-                "3PM": "player_threes",
-                "Moneyline": "h2h",
-                "Spread": "spreads",
-                "Total": "totals"
-            }
-            market_key = market_key_map.get(r["Market"], r.get("Market Key", ""))
-
-            fd_mv, sharp_mv = last_10min_move(
-                r.get("event_id","") or r.get("Event ID",""),
-                r["Player"], 
-                market_key,  # ✅ Use API key
-                float(r["Line"]), 
-                r["Side"]
-            )
-            fd_pct = fd_mv / 100.0  # 150 bps = 1.5%
-            sharp_pct = sharp_mv / 100.0
-            move_str = f'FD {fd_pct:+.1f}% / Shrp {sharp_pct:+.1f}%'
-            
-            # Extract injury and minutes from Adj Tags if not already set
-            injury_status = r.get("Injury", "")
-            min_med_iqr = r.get("Min Med / IQR", "")
-            
-            if not injury_status or not min_med_iqr:
-                tags = str(r.get("Adj Tags","")).split(",") if r.get("Adj Tags") else []
-                tags = [t.strip() for t in tags if t.strip()]
-                for t in tags:
-                    if "/" in t and any(ch.isdigit() for ch in t):   # minutes tag like "30.1/4.2"
-                        if not min_med_iqr:
-                            min_med_iqr = t
-                    elif t.lower() in ("out","doubtful","q/gtd","probable"):
-                        if not injury_status:
-                            injury_status = t
-            
-            # Format Other Odds with + sign if it exists
-            other_odds_display = ""
-            if r.get("Other Odds") not in ("", None):
-                try:
-                    other_odds_display = f'{int(r["Other Odds"]):+d}'
-                except:
-                    other_odds_display = str(r.get("Other Odds", ""))
-            
-            values = [
-                r["Badge"],
-                r["Confidence"],
-                r.get("Corr","OK"),
-                bet,
-                f'{int(r["FD Odds"]):+d}',
-                f'{int(r.get("Fair Odds", 0)):+d}' if r.get("Fair Odds") not in ("", None, 0) else "",
-                f'{float(r["True Prob %"]):.2f}',
-                f'{float(r["EV %"]):.2f}',
-                f'{float(r["Kelly %"]):.2f}',
-                f'${kelly_dollars:.2f}',
-                move_str,
-                r.get("Team Inj", ""),
-                injury_status,
-                min_med_iqr,
-                r.get("Best Other", ""),
-                other_odds_display,
-                int(r.get("Gap (¢)", 0)),
-                int(r["Books Used"]),
-                r["Matchup"],
-                r["Tip (ET)"],
-            ]
-            badge = r["Badge"]
-            self.tree.insert("", "end", values=values, tags=(badge, badge + "_BG"))
+    def _insert_row(self, r: Dict[str, Any], i: int):
+        bet = _render_bet_text(r)
+
+        kelly_dollars = self.bankroll_cache * (r["Kelly %"]/100.0)
+        fd_mv, sharp_mv = self._moves.get(_row_move_key(r), (0, 0))
+        fd_pct = fd_mv / 100.0  # 150 bps = 1.5%
+        sharp_pct = sharp_mv / 100.0
+        move_str = f'FD {fd_pct:+.1f}% / Shrp {sharp_pct:+.1f}%'
+        
+        # Injury / minutes resolved once per load by _parse_adj_tags
+        injury_status = r.get("_injury", "")
+        min_med_iqr = r.get("_min_med_iqr", "")
+
+        # Format Other Odds with + sign if it exists
+        other_odds_display = ""
+        if r.get("Other Odds") not in ("", None):
+            try:
+                other_odds_display = _fmt_signed(int(r["Other Odds"]))
+            except:
+                other_odds_display = str(r.get("Other Odds", ""))
+        
+        values = [
+            r["Badge"],
+            r["Confidence"],
+            r.get("Corr","OK"),
+            bet,
+            _fmt_signed(int(r["FD Odds"])),
+            _fmt_signed(int(r.get("Fair Odds", 0))) if r.get("Fair Odds") not in ("", None, 0) else "",
+            f'{float(r["True Prob %"]):.2f}',
+            f'{float(r["EV %"]):.2f}',
+            f'{float(r["Kelly %"]):.2f}',
+            f'${kelly_dollars:.2f}',
+            move_str,
+            r.get("Team Inj", ""),
+            injury_status,
+            min_med_iqr,
+            r.get("Best Other", ""),
+            other_odds_display,
+            int(r.get("Gap (¢)", 0)),
+            int(r["Books Used"]),
+            r["Matchup"],
+            r["Tip (ET)"],
+        ]
+        badge = r["Badge"]
+        tags = self._badge_tags.get(badge)
+        if tags is None:
+            tags = self._badge_tags[badge] = (badge, badge + "_BG")
+        # Straight to Tcl: skips ttk.Treeview.insert's option formatting on every row
+        # iid "row_<i>" indexes straight back into current_rows for _get_selected_bets
+        self.tree.tk.call(self._tree_path, "insert", "", "end", "-id", f"row_{i}", "-values", tuple(values), "-tags", tags)
 
         # ===================== Parlay workflow (AI-CHANGE) ======================
     def _get_selected_bets(self) -> List[Dict[str, Any]]:
         """Return list of current_rows for the selected Treeview items (multi-select allowed)."""
-        out = []
-        sel = self.tree.selection()
-        if not sel:
-            return out
-        # Build a lookup map from visible row values to backing dict
-        # We’ll match by a stable tuple of visible columns.
-        idx_map = {}
-        for r in self.current_rows:
-            bet_key = (
-                r.get("Matchup",""), r.get("Player",""), r.get("Market",""),
-                r.get("Side",""), float(r.get("Line", 0.0)), int(r.get("FD Odds", 0))
-            )
-            idx_map.setdefault(bet_key, []).append(r)
-
-        cols = ["Matchup","Player","Market","Side","Line","FD"]  # these are the headings in the tree
-        for iid in sel:
-            vals = self.tree.item(iid, "values")
-            try:
-                match = vals[18]  # "Matchup"
-                bettxt= vals[3]   # "Bet" (contains player/side/line/market already)
-                fd    = int(str(vals[4]).replace("+","").replace("−","-"))
-                # Re-derive keys from columns so we can map back to current_rows:
-                # Because Bet text differs by market, parse minimally using our rendering rules:
-                # We stored full fields in columns too, so prefer them:
-                # columns order in _build_table: ["Badge","Conf (Hit%)","Corr","Bet","FD","Fair","True %","EV %","Kelly %","Kelly $",
-                #   "Move(10m)","Team Inj","Injury","Min Med / IQR","Best Other","Other","Gap¢","Books","Matchup","Tip"]
-                # We’ll pick from self.current_rows by closest key below:
-                # Try to scan candidates in current_rows with same Matchup and FD.
-                candidates = [r for r in self.current_rows if r.get("Matchup","")==match and int(r.get("FD Odds",0))==fd]
-                # Narrow further by Player/Market/Side/Line using bet text tokens:
-                pick = None
-                for r in candidates:
-                    # Construct our human string the same way _load_rows did for matching
-                    if r["Market"] == "h2h":
-                        expected = f'{r["Player"]} ML'
-                    elif r["Market"] == "spreads":
-                        expected = f'{r["Player"]} {float(r["Line"]):+g} SPREAD'
-                    elif r["Market"] == "totals":
-                        expected = f'{r["Side"]} {r["Line"]} TOTAL'
-                    else:
-                        side_symbol = "o" if r["Side"] == "Over" else "u"
-                        short = {"player_points":"PTS","player_rebounds":"REB","player_assists":"AST","player_threes":"3PM"}.get(r["Market"], r["Market"])
-                        expected = f'{r["Player"]} {side_symbol}{r["Line"]} {short}'
-                    if expected == bettxt:
-                        pick = r; break
-                if pick is None and candidates:
-                    pick = candidates[0]  # best-effort fallback
-                if pick:
-                    out.append(pick)
-            except Exception:
-                pass
-        return out
+        rows = self.current_rows
+        return [rows[int(iid[4:])] for iid in self.tree.selection() if iid.startswith("row_")]
 
     def _build_parlay_lists(self, picks: List[Dict[str, Any]], top_k_pairs: int = 20, top_k_triples: int = 20):
         """
@@ -3841,64 +3919,84 @@ class App:
           - For 'too-same' player duplicates across legs → skip.
           - Apply independence discount via _parlay_independence_discount.
         """
-        # Dedup identical legs from selection
-        def _sig(r):
-            return (r["Matchup"], r["Player"], r["Market"], r["Side"], r["Line"])
-        seen = set()
-        cleaned = []
+        # Dedup identical legs from selection (first occurrence wins, order kept)
+        cleaned: Dict[tuple, Dict[str, Any]] = {}
         for r in picks:
-            key = _sig(r)
-            if key not in seen:
-                seen.add(key)
-                cleaned.append(r)
-        picks = cleaned
+            cleaned.setdefault((r["Matchup"], r["Player"], r["Market"], r["Side"], r["Line"]), r)
+        picks = list(cleaned.values())
 
-        pairs = []
         triples = []
 
+        # Per-leg probability / decimal odds resolved once, not once per combination
+        for r in picks:
+            r["_p"] = _row_true_prob(r)
+            r["_dec"] = _row_dec_odds(r)
+            # Parlay-window text, formatted once per leg rather than once per combo it lands in
+            market = r.get("Market Key", r["Market"])  # Prefer API key
+            r["_leg_display"] = f'{_render_bet_text(r, market)} ({_fmt_signed(int(r["FD Odds"]))})'
+
+        # Bucket legs by player so same-player combos are never generated
+        by_player: Dict[str, List[int]] = {}
+        for idx, r in enumerate(picks):
+            by_player.setdefault(r["Player"], []).append(idx)
+        buckets = list(by_player.values())
+
+        # Candidates carry the negated leg indices as a final tie-break so ties
+        # come out in the same order as a plain index-order enumeration would.
+        def _top(cands, k):
+            return [(legs, p, dec, ev) for _, _, _, legs, p, dec, ev in heapq.nlargest(k, cands)]
+
         # --- Build pairs (Safe) ---
-        for a, b in itertools.combinations(picks, 2):
-            # No same-player doubles
-            if a["Player"] == b["Player"]:
-                continue
-            legs = [a, b]
-            p, dec, ev = _parlay_metrics(legs)
-            pairs.append((legs, p, dec, ev))
-        # Safe list: sort by hit probability desc, tie-break EV desc
-        pairs.sort(key=lambda x: (x[1], x[3]), reverse=True)
-        pairs = pairs[:top_k_pairs]
+        cands = []
+        for ba, bb in itertools.combinations(buckets, 2):
+            for a, b in itertools.product(ba, bb):
+                i, j = (a, b) if a < b else (b, a)
+                legs = [picks[i], picks[j]]
+                p, dec, ev = _parlay_metrics_fast(legs)
+                # Safe list: hit probability desc, tie-break EV desc
+                cands.append((p, ev, (-i, -j), legs, p, dec, ev))
+        pairs = _top(cands, top_k_pairs)
 
         # --- Build triples (Aggressive) ---
-        if len(picks) >= 3:
-            for a, b, c in itertools.combinations(picks, 3):
-                # No same-player triples
-                if len({a["Player"], b["Player"], c["Player"]}) < 3:
-                    continue
-                legs = [a, b, c]
-                p, dec, ev = _parlay_metrics(legs)
-                triples.append((legs, p, dec, ev))
-            # Aggressive list: sort by EV desc, tie-break hit probability desc
-            triples.sort(key=lambda x: (x[3], x[1]), reverse=True)
-            triples = triples[:top_k_triples]
+        if len(buckets) >= 3:
+            cands = []
+            for ba, bb, bc in itertools.combinations(buckets, 3):
+                for legs_idx in itertools.product(ba, bb, bc):
+                    i, j, k = sorted(legs_idx)
+                    legs = [picks[i], picks[j], picks[k]]
+                    p, dec, ev = _parlay_metrics_fast(legs)
+                    # Aggressive list: EV desc, tie-break hit probability desc
+                    cands.append((ev, p, (-i, -j, -k), legs, p, dec, ev))
+            triples = _top(cands, top_k_triples)
 
         return pairs, triples
 
     def _open_parlays_window(self, pairs, triples):
         """Show a modal window listing the parlays with copy/export options."""
+        # If nothing built, hint user instead of opening an empty window
+        if not pairs and not triples:
+            self.set_status("Select at least two picks to build parlays.")
+            return
+
         top = tk.Toplevel(self.frame)
         top.title("Suggested Parlays")
         wrap = ttk.Frame(top, padding=12); wrap.pack(fill="both", expand=True)
         nb = ttk.Notebook(wrap); nb.pack(fill="both", expand=True)
 
-        def _make_tree(parent, title):
+        def _make_tree(parent, title, n_rows):
             frame = ttk.Frame(parent); parent.add(frame, text=title)
             cols = ["Type","Legs","Parlay Hit %","Parlay EV %","Parlay Dec Odds"]
-            tree = ttk.Treeview(frame, columns=cols, show="headings", height=16)
+            # Only as tall as the list it holds (top-k is small), capped at the old 16 rows
+            tree = ttk.Treeview(frame, columns=cols, show="headings", height=max(1, min(n_rows, 16)))
             widths = [90, 700, 110, 110, 140]
             anchors= ["center","w","center","center","center"]
+            # All headings/columns configured in one Tcl script instead of two calls per column
+            script = []
             for (c,w,a) in zip(cols, widths, anchors):
-                tree.heading(c, text=c, command=lambda col=c, t=tree: self._sort_tree(t, col))
-                tree.column(c, width=w, anchor=a)
+                cmd = tree.register(lambda col=c, t=tree: self._sort_tree(t, col))
+                script.append(f"{tree} heading {{{c}}} -text {{{c}}} -command {cmd}")
+                script.append(f"{tree} column {{{c}}} -width {w} -anchor {a}")
+            tree.tk.eval("\n".join(script))
             tree.pack(fill="both", expand=True)
             btns = ttk.Frame(frame); btns.pack(anchor="e", pady=(8,0))
             ttk.Button(btns, text="Copy CSV", command=lambda t=tree: self._copy_parlay_csv(t),
@@ -3907,30 +4005,11 @@ class App:
                        bootstyle=("danger" if use_bootstrap else None)).pack(side="left", padx=6)
             return tree
 
-        tree_pairs   = _make_tree(nb, "2-Leg Safe")
-        tree_triples = _make_tree(nb, "3-Leg Aggressive")
+        tree_pairs   = _make_tree(nb, "2-Leg Safe", len(pairs))
+        tree_triples = _make_tree(nb, "3-Leg Aggressive", len(triples))
 
         def _fmt_legs(legs):
-            pieces = []
-            for r in legs:
-                market = r.get("Market Key", r["Market"])  # Prefer API key
-                if market == "h2h":
-                    s = f'{r["Player"]} ML ({int(r["FD Odds"]):+d})'
-                elif market == "spreads":
-                    s = f'{r["Player"]} {float(r["Line"]):+g} SPREAD ({int(r["FD Odds"]):+d})'
-                elif market == "totals":
-                    s = f'{r["Side"]} {r["Line"]} TOTAL ({int(r["FD Odds"]):+d})'
-                else:  # Props
-                    sym = "o" if r["Side"] == "Over" else "u"
-                    short = {
-                        "player_points":"PTS",
-                        "player_rebounds":"REB",
-                        "player_assists":"AST",
-                        "player_threes":"3PM"
-                    }.get(market, market)
-                    s = f'{r["Player"]} {sym}{r["Line"]} {short} ({int(r["FD Odds"]):+d})'
-                pieces.append(s)
-            return "  •  ".join(pieces)
+            return "  •  ".join(r["_leg_display"] for r in legs)
 
         for legs, p, dec, ev in pairs:
             tree_pairs.insert("", "end", values=(
@@ -3949,21 +4028,26 @@ class App:
                 f"{dec:.4f}",
             ))
 
-        # If nothing built, hint user
-        if not pairs and not triples:
-            self.set_status("Select at least two picks to build parlays.")
-
     def _sort_tree(self, tree: "TtkTreeview", col: str, descending: Optional[bool]=None):
-        data = [(tree.set(k, col), k) for k in tree.get_children("")]
-        def try_num(s):
-            try: return float(str(s))
-            except: return s
+        # Parlay trees are static once filled, so sort keys are built once per column
+        # from a single pass over the rows and reused on every re-sort.
+        key_cache = getattr(tree, "_num_cache", None)
+        if key_cache is None:
+            key_cache = tree._num_cache = {}
+        keys = key_cache.get(col)
+        if keys is None:
+            cells = {iid: str(tree.set(iid, col)) for iid in tree.get_children("")}
+            if all(v.lstrip("+-").replace(".", "", 1).isdigit() for v in cells.values()):
+                keys = {iid: float(v) for iid, v in cells.items()}
+            else:
+                keys = cells
+            key_cache[col] = keys
         # toggle direction by remembering it on the widget
         tag = f"_sort_{col}"
         current = getattr(tree, tag, False) if descending is None else descending
-        data.sort(key=lambda t: try_num(t[0]), reverse=not current)
-        for i, item in enumerate(data):
-            tree.move(item[1], "", i)
+        order = sorted(tree.get_children(""), key=keys.__getitem__, reverse=not current)
+        for i, iid in enumerate(order):
+            tree.move(iid, "", i)
         setattr(tree, tag, not current)
 
     def _tree_to_csv(self, tree: "TtkTreeview") -> str:
@@ -3971,9 +4055,7 @@ class App:
         buf = StringIO()
         w = csv.writer(buf)
         w.writerow(cols)
-        for iid in tree.get_children(""):
-            row = [tree.set(iid, c) for c in cols]
-            w.writerow(row)
+        w.writerows([tree.set(iid, c) for c in cols] for iid in tree.get_children(""))
         return buf.getvalue()
 
     def _copy_parlay_csv(self, tree: "TtkTreeview"):
@@ -4021,15 +4103,16 @@ class App:
         keys = ["Badge","Confidence","Corr","Matchup","Tip (ET)","Player","Market","Side","Line",
                 "FD Odds","Fair Odds","True Prob %","EV %","Team Inj","Injury","Min Med / IQR",
                 "Best Other","Other Odds","Gap (¢)","Books Used","Kelly %"]
+        int_cols = {"FD Odds", "Fair Odds"}
+        getters = [(k, k in int_cols) for k in keys]
+
+        def _project(r):
+            return [_csv_int(r.get(k, "")) if as_int else r.get(k, "") for k, as_int in getters]
+
         with open(fn, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=keys); w.writeheader()
-            for r in rows:
-                out = {k: r.get(k, "") for k in keys}
-                try: out["FD Odds"] = int(out["FD Odds"]) if out["FD Odds"] != "" else ""
-                except Exception: pass
-                try: out["Fair Odds"] = int(out["Fair Odds"]) if out["Fair Odds"] != "" else ""
-                except Exception: pass
-                w.writerow(out)
+            w = csv.writer(f)
+            w.writerow(keys)
+            w.writerows(_project(r) for r in rows)
         return len(rows)
 
 def main():
@@ -6,6 +6,8 @@ Send daily picks to email subscribers via Resend.com
 import os
 import sys
 import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 try:
@@ -16,7 +18,7 @@ except ImportError:
 
 try:
     import resend
-    from upload_to_supabase import supabase, get_todays_picks, get_subscribers, mark_email_sent
+    from upload_to_supabase import configure_logging, fetch_and_mark_sent, get_subscribers, mark_email_sent
 except ImportError as e:
     print(f"Error: Missing dependencies. Run: pip install resend")
     print(f"Details: {e}")
@@ -31,118 +33,162 @@ if not RESEND_API_KEY:
 
 resend.api_key = RESEND_API_KEY
 
+# Resend accepts at most 100 emails per batch request
+RESEND_BATCH_SIZE = 100
+RESEND_MAX_WORKERS = 4
 
-def create_email_html(picks_data):
-    """Generate HTML email from picks data"""
-    
-    locks = picks_data.get('locks', [])
-    lottos = picks_data.get('lotto_tickets', [])
-    parlays = picks_data.get('parlays', [])
-    date = picks_data.get('date', datetime.now().strftime('%Y-%m-%d'))
-    
-    html = f"""
+
+# Static email chrome; only the pick blocks are formatted per send
+_EMAIL_HEAD = """
     <!DOCTYPE html>
     <html>
     <head>
         <style>
-            body {{ font-family: monospace; background: #0f172a; color: #e2e8f0; margin: 0; padding: 20px; }}
-            .container {{ max-width: 600px; margin: 0 auto; background: #1e293b; border: 1px solid #334155; border-radius: 8px; padding: 30px; }}
-            h1 {{ color: #3b82f6; text-transform: uppercase; margin-top: 0; }}
-            h2 {{ color: #60a5fa; border-bottom: 2px solid #1e40af; padding-bottom: 10px; margin-top: 30px; }}
-            .pick {{ background: #0f172a; border: 1px solid #334155; border-radius: 6px; padding: 15px; margin: 10px 0; }}
-            .pick-header {{ display: flex; justify-content: space-between; margin-bottom: 10px; }}
-            .confidence {{ background: #1e40af; color: white; padding: 4px 12px; border-radius: 4px; font-weight: bold; }}
-            .pick-title {{ font-size: 18px; color: white; font-weight: bold; margin: 8px 0; }}
-            .pick-details {{ color: #94a3b8; font-size: 14px; }}
-            .odds {{ color: #3b82f6; font-weight: bold; font-size: 16px; }}
-            .parlay {{ background: #1e293b; border: 1px solid #3b82f6; border-radius: 6px; padding: 15px; margin: 10px 0; }}
-            .parlay-leg {{ padding: 8px; margin: 5px 0; background: #0f172a; border-radius: 4px; color: #e2e8f0; }}
-            .footer {{ margin-top: 30px; padding-top: 20px; border-top: 1px solid #334155; color: #64748b; font-size: 12px; text-align: center; }}
-            .empty {{ color: #64748b; font-style: italic; padding: 20px; text-align: center; }}
+            body { font-family: monospace; background: #0f172a; color: #e2e8f0; margin: 0; padding: 20px; }
+            .container { max-width: 600px; margin: 0 auto; background: #1e293b; border: 1px solid #334155; border-radius: 8px; padding: 30px; }
+            h1 { color: #3b82f6; text-transform: uppercase; margin-top: 0; }
+            h2 { color: #60a5fa; border-bottom: 2px solid #1e40af; padding-bottom: 10px; margin-top: 30px; }
+            .pick { background: #0f172a; border: 1px solid #334155; border-radius: 6px; padding: 15px; margin: 10px 0; }
+            .pick-header { display: flex; justify-content: space-between; margin-bottom: 10px; }
+            .confidence { background: #1e40af; color: white; padding: 4px 12px; border-radius: 4px; font-weight: bold; }
+            .pick-title { font-size: 18px; color: white; font-weight: bold; margin: 8px 0; }
+            .pick-details { color: #94a3b8; font-size: 14px; }
+            .odds { color: #3b82f6; font-weight: bold; font-size: 16px; }
+            .parlay { background: #1e293b; border: 1px solid #3b82f6; border-radius: 6px; padding: 15px; margin: 10px 0; }
+            .parlay-leg { padding: 8px; margin: 5px 0; background: #0f172a; border-radius: 4px; color: #e2e8f0; }
+            .footer { margin-top: 30px; padding-top: 20px; border-top: 1px solid #334155; color: #64748b; font-size: 12px; text-align: center; }
+            .empty { color: #64748b; font-style: italic; padding: 20px; text-align: center; }
         </style>
     </head>
     <body>
         <div class="container">
-            <h1>🏀 NAO'S PICKS - {date}</h1>
+            <h1>🏀 NAO'S PICKS - """
+
+_EMAIL_LOCKS_HEADER = """</h1>
             
             <h2>🔒 LOCKS</h2>
     """
-    
-    if locks:
-        for lock in locks:
-            html += f"""
+
+_EMAIL_TAIL = """
+            <div class="footer">
+                <p>Visit <a href="https://nba-picks-site.vercel.app" style="color: #3b82f6;">nba-picks-site.vercel.app</a> for more details</p>
+                <p>You're receiving this because you subscribed to NBA Picks</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def _fmt_pick(pick):
+    """One lock / lotto card."""
+    return f"""
             <div class="pick">
                 <div class="pick-header">
-                    <span class="confidence">{lock['confidence']}% CONFIDENCE</span>
-                    <span class="odds">{lock['fd_odds']:+d}</span>
+                    <span class="confidence">{pick['confidence']}% CONFIDENCE</span>
+                    <span class="odds">{pick['fd_odds']:+d}</span>
                 </div>
-                <div class="pick-title">{lock['pick']}</div>
-                <div class="pick-details">{lock['matchup']} • {lock['tip_time']}</div>
+                <div class="pick-title">{pick['pick']}</div>
+                <div class="pick-details">{pick['matchup']} • {pick['tip_time']}</div>
             </div>
             """
+
+
+def _fmt_parlay(parlay):
+    """One parlay card with its legs."""
+    parts = [f"""
+            <div class="parlay">
+                <div class="pick-header">
+                    <strong>{parlay['legs']}-LEG PARLAY</strong>
+                    <span class="odds">{parlay['combined_odds']:+d} ({parlay['confidence']}%)</span>
+                </div>
+            """]
+    parts.extend(f'<div class="parlay-leg">LEG {i}: {pick}</div>' for i, pick in enumerate(parlay['picks'], 1))
+    parts.append('</div>')
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_picks_body(picks_json):
+    """Locks / lottos / parlays sections; keyed on the picks JSON so reruns reuse it."""
+    picks_data = json.loads(picks_json)
+    locks = picks_data.get('locks', [])
+    lottos = picks_data.get('lotto_tickets', [])
+    parlays = picks_data.get('parlays', [])
+    
+    parts = []
+    
+    if locks:
+        parts.extend(_fmt_pick(lock) for lock in locks)
     else:
-        html += '<div class="empty">No locks available today</div>'
+        parts.append('<div class="empty">No locks available today</div>')
     
-    html += '<h2>🎰 LOTTO TICKETS</h2>'
+    parts.append('<h2>🎰 LOTTO TICKETS</h2>')
     
     if lottos:
-        for lotto in lottos:
-            html += f"""
-            <div class="pick">
-                <div class="pick-header">
-                    <span class="confidence">{lotto['confidence']}% CONFIDENCE</span>
-                    <span class="odds">{lotto['fd_odds']:+d}</span>
-                </div>
-                <div class="pick-title">{lotto['pick']}</div>
-                <div class="pick-details">{lotto['matchup']} • {lotto['tip_time']}</div>
-            </div>
-            """
+        parts.extend(_fmt_pick(lotto) for lotto in lottos)
     else:
-        html += '<div class="empty">No lotto tickets available today</div>'
+        parts.append('<div class="empty">No lotto tickets available today</div>')
     
-    html += '<h2>🎲 PARLAYS</h2>'
+    parts.append('<h2>🎲 PARLAYS</h2>')
     
     if parlays:
-        for parlay in parlays:
-            html += f"""
-            <div class="parlay">
-                <div class="pick-header">
-                    <strong>{parlay['legs']}-LEG PARLAY</strong>
-                    <span class="odds">{parlay['combined_odds']:+d} ({parlay['confidence']}%)</span>
-                </div>
-            """
-            for i, pick in enumerate(parlay['picks'], 1):
-                html += f'<div class="parlay-leg">LEG {i}: {pick}</div>'
-            html += '</div>'
+        parts.extend(_fmt_parlay(parlay) for parlay in parlays)
     else:
-        html += '<div class="empty">No parlays available today</div>'
-    
-    html += """
-            <div class="footer">
-                <p>Visit <a href="https://nba-picks-site.vercel.app" style="color: #3b82f6;">nba-picks-site.vercel.app</a> for more details</p>
-                <p>You're receiving this because you subscribed to NBA Picks</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+        parts.append('<div class="empty">No parlays available today</div>')
     
-    return html
+    return "".join(parts)
+
+
+def _wrap_email(body, date):
+    """Static head/footer around a picks body."""
+    return "".join((_EMAIL_HEAD, date, _EMAIL_LOCKS_HEADER, body, _EMAIL_TAIL))
+
+
+def create_email_html(picks_data):
+    """Generate HTML email from picks data"""
+    date = picks_data.get('date', datetime.now().strftime('%Y-%m-%d'))
+    body = _build_picks_body(json.dumps(picks_data, sort_keys=True, default=str))
+    return _wrap_email(body, date)
+
 
+def _send_batch(chunk, params_template):
+    """Send one Resend batch; returns (sent, failed)."""
+    batch = [{**params_template, "to": [email]} for email in chunk]
+    try:
+        resp = resend.Batch.send(batch)
+        sent = len(resp.get("data") or []) if isinstance(resp, dict) else len(chunk)
+        print(f"  ✓ Sent batch of {sent} ({chunk[0]} … {chunk[-1]})")
+        return sent, len(chunk) - sent
+    
+    except Exception as e:
+        print(f"  ✗ Failed to send batch of {len(chunk)} ({chunk[0]} … {chunk[-1]}): {e}")
+        return 0, len(chunk)
 
-def send_picks_email():
-    """Send today's picks to all subscribers"""
+
+def send_picks_email(force=False):
+    """Send today's picks to all subscribers (force=True resends an already-sent day)"""
     
     print("\n" + "="*60)
     print("SENDING DAILY PICKS EMAILS")
     print("="*60 + "\n")
     
-    # Get today's picks
-    print("📊 Fetching today's picks from Supabase...")
-    picks_data = get_todays_picks()
+    # Get subscribers first so an empty list never claims today's picks
+    print("📧 Fetching subscribers...")
+    subscribers = get_subscribers()
+    
+    if not subscribers:
+        print("✗ No subscribers found")
+        return False
+    
+    print(f"✓ Found {len(subscribers)} subscribers")
+    
+    # Fetch today's picks and flag them sent in one call (a second run gets nothing)
+    print("\n📊 Fetching today's picks from Supabase...")
+    picks_data = fetch_and_mark_sent(force=force)
     
     if not picks_data:
-        print("✗ No picks found for today - skipping email")
+        print("✗ No unsent picks found for today - skipping email")
         return False
     
     print(f"✓ Found picks for {picks_data['date']}")
@@ -150,16 +196,6 @@ def send_picks_email():
     print(f"  - Lotto Tickets: {len(picks_data.get('lotto_tickets', []))}")
     print(f"  - Parlays: {len(picks_data.get('parlays', []))}")
     
-    # Get subscribers
-    print("\n📧 Fetching subscribers...")
-    subscribers = get_subscribers()
-    
-    if not subscribers:
-        print("✗ No subscribers found")
-        return False
-    
-    print(f"✓ Found {len(subscribers)} subscribers")
-    
     # Generate email HTML
     print("\n✉️  Generating email...")
     email_html = create_email_html(picks_data)
@@ -170,28 +206,23 @@ def send_picks_email():
     success_count = 0
     fail_count = 0
     
-    for email in subscribers:
-        try:
-            params = {
-                "from": "NBA Picks <picks@naobettor.com>",
-                "to": [email],
-                "subject": f"🏀 Today's NBA Picks - {picks_data['date']}",
-                "html": email_html,
-            }
-            
-            resend.Emails.send(params)
-            print(f"  ✓ Sent to {email}")
-            success_count += 1
-            
-        except Exception as e:
-            print(f"  ✗ Failed to send to {email}: {e}")
-            fail_count += 1
+    params_template = {
+        "from": "NBA Picks <picks@naobettor.com>",
+        "subject": f"🏀 Today's NBA Picks - {picks_data['date']}",
+        "html": email_html,
+    }
+    
+    # One Resend batch call per RESEND_BATCH_SIZE recipients, batches in flight together
+    chunks = [subscribers[i:i + RESEND_BATCH_SIZE] for i in range(0, len(subscribers), RESEND_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=min(RESEND_MAX_WORKERS, len(chunks))) as pool:
+        for sent, failed in pool.map(lambda chunk: _send_batch(chunk, params_template), chunks):
+            success_count += sent
+            fail_count += failed
     
-    # Mark as sent in database
-    if success_count > 0:
-        print("\n💾 Marking emails as sent in database...")
-        mark_email_sent()
-        print("✓ Database updated")
+    # Picks were flagged sent when fetched; hand them back if nothing went out
+    if success_count == 0:
+        print("\n💾 No emails delivered - releasing today's picks in database...")
+        mark_email_sent(picks_data['date'], sent=False)
     
     # Summary
     print("\n" + "="*60)
@@ -206,5 +237,12 @@ def send_picks_email():
 
 
 if __name__ == "__main__":
-    success = send_picks_email()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Send today's picks to subscribers")
+    parser.add_argument("--force", action="store_true", help="Resend even if today's picks are already marked sent")
+    args = parser.parse_args()
+    
+    configure_logging()
+    success = send_picks_email(force=args.force)
     sys.exit(0 if success else 1)
\ No newline at end of file
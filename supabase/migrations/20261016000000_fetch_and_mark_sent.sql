@@ -0,0 +1,10 @@
+-- Claim a day's picks for the email run: returns the row and flags it
+-- email_sent in one statement, so two runs can't both send.
+-- Used by upload_to_supabase.fetch_and_mark_sent() via POST /rpc/fetch_and_mark_sent.
+CREATE OR REPLACE FUNCTION fetch_and_mark_sent(p_date date)
+RETURNS SETOF daily_picks AS $$
+    UPDATE daily_picks
+       SET email_sent = true, email_sent_at = now()
+     WHERE date = p_date AND email_sent = false
+    RETURNING *;
+$$ LANGUAGE sql;
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Regression check for the spreads fair-price fallback in nba_bettor.py:
+a book that only quotes the opposite side at a non-mirrored line must still
+be paired (nearest line within 0.5) instead of breaking the event.
+"""
+
+import sys
+
+import nba_bettor as nb
+
+
+def _book(key, home_line, home_price, away_line, away_price):
+    return {"key": key, "markets": [{"key": "spreads", "outcomes": [
+        {"name": "Home", "point": home_line, "price": home_price},
+        {"name": "Away", "point": away_line, "price": away_price},
+    ]}]}
+
+
+def _run_event(bookmakers):
+    # Stub the network/DB hooks for this call only and put the originals back,
+    # so nothing leaks into whatever imports nba_bettor next
+    stubs = {
+        "fetch_event_props_retry": lambda eid, markets: ({"bookmakers": bookmakers}, {}),
+        "db_log_tick": lambda rows: None,
+        "steam_boost": lambda *a, **k: 0.0,
+        "team_pressure_scores": lambda a, b, team_filter=None: (1, 0, 1, 0.01),
+    }
+    saved = {name: getattr(nb, name) for name in stubs}
+    try:
+        for name, fn in stubs.items():
+            setattr(nb, name, fn)
+        evt = {"id": "evt1", "home": "Home", "away": "Away", "tip": "2025-01-01T00:00:00Z"}
+        rows, _msg = nb._process_one_event(evt, ["spreads"], 1, 0.0, -100.0, 0.0, -100.0, None,
+                                           "morning", False, False, 0, 0, 0.0, 1800, None)
+        return rows
+    finally:
+        for name, fn in saved.items():
+            setattr(nb, name, fn)
+
+
+def test_non_mirrored_opposite_line():
+    others = [b for b in nb.OTHER_BOOKS if b != nb.FANDUEL_KEY][:2]
+    bookmakers = [_book(nb.FANDUEL_KEY, -3.5, -110, 3.5, -110)]
+    # Other books match FD's Home -3.5 but hang the Away side at +4.0, so there
+    # is no exact +3.5 mirror and the nearest-line fallback has to pair them
+    bookmakers += [_book(b, -3.5, -105, 4.0, -115) for b in others]
+    rows = _run_event(bookmakers)
+    home = [r for r in rows if r["Player"] == "Home" and float(r["Line"]) == -3.5]
+    assert home, "Home -3.5 should be priced against the +4.0 fallback line"
+    assert int(home[0]["Books Used"]) >= len(others)
+
+
+if __name__ == "__main__":
+    try:
+        test_non_mirrored_opposite_line()
+    except AssertionError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    print("✓ Spreads fallback pairs non-mirrored opposite lines")
@@ -7,22 +7,183 @@ Run this after generate_picks.py creates the JSON
 import os
 import sys
 import json
-from datetime import date, datetime
-from supabase import create_client, Client
+import time
+import gzip
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+import httpx
 from dotenv import load_dotenv
 
+# Optional C JSON codec for large picks files / upsert bodies
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Optional direct Postgres driver (pip install "psycopg[binary]") for bulk COPY
+# through the Supavisor pooler; without it add_subscribers uses the REST insert
+try:
+    import psycopg
+    HAS_PSYCOPG = True
+except ImportError:
+    HAS_PSYCOPG = False
+
+
+def _json_loads(raw):
+    return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+
+
+def _json_dumps(obj) -> bytes:
+    return orjson.dumps(obj) if HAS_ORJSON else json.dumps(obj).encode("utf-8")
+
 load_dotenv()
+
+log = logging.getLogger(__name__)
+
+
+def configure_logging():
+    """
+    Console logging for the entry scripts: this module's messages at INFO on
+    stdout (interleaved with their print output), third-party chatter such as
+    httpx's per-request lines held at WARNING.
+    """
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(message)s", stream=sys.stdout)
+    log.setLevel(logging.INFO)
+
 # Supabase credentials (from environment variables)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+# Transaction-mode pooler, e.g. postgresql://...@aws-0-<region>.pooler.supabase.com:6543/postgres
+POSTGRES_POOL_URL = os.getenv("POSTGRES_POOL_URL")
+
+# Columns the email renderer actually reads from a daily_picks row
+EMAIL_PICK_COLUMNS = "date,locks,lotto_tickets,parlays"
+
+
+_client: "httpx.Client | None" = None
+_client_lock = threading.Lock()
+
+
+def get_supabase_client() -> httpx.Client:
+    """
+    Shared PostgREST client, built on first use rather than at import.
+    One pooled keep-alive connection serves every call in the process; the
+    lock keeps concurrent first calls from each building (and leaking) one.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+                raise RuntimeError(
+                    "Missing Supabase credentials - set SUPABASE_URL and "
+                    "SUPABASE_SERVICE_ROLE_KEY environment variables"
+                )
+            _client = httpx.Client(
+                base_url=f"{SUPABASE_URL.rstrip('/')}/rest/v1",
+                headers={
+                    "apikey": SUPABASE_SERVICE_KEY,
+                    "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+                },
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                timeout=30,
+            )
+    return _client
+
+
+def _matched_count(resp):
+    """
+    Rows matched by a count=exact request, from Content-Range ("*/3", "0-2/3").
+    None when the server didn't report a count.
+    """
+    total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _utc_now_iso():
+    """Timezone-aware timestamp for timestamptz columns"""
+    return datetime.now(timezone.utc).isoformat()
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    print("ERROR: Missing Supabase credentials")
-    print("Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables")
-    sys.exit(1)
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+def _rows(resp):
+    """Raise on HTTP errors, return the PostgREST row list"""
+    resp.raise_for_status()
+    return resp.json() if resp.content else []
+
+
+# Expected shape of a picks payload: key -> required type
+_PICKS_SCHEMA = {"locks": list, "lotto_tickets": list, "parlays": list}
+_PICKS_REQUIRED_KEYS = frozenset(_PICKS_SCHEMA)
+
+
+def _validate_picks(picks_json):
+    """
+    Raise ValueError only when the pick lists (locks, lotto_tickets, parlays)
+    are missing or not lists. Cosmetic fields never block the upload: odd
+    values are coerced with a warning. Returns (total_picks, generated_at,
+    window_mode) ready for the row.
+    """
+    if not isinstance(picks_json, dict):
+        raise ValueError("Invalid picks JSON - expected an object")
+    if not _PICKS_REQUIRED_KEYS <= picks_json.keys():
+        raise ValueError("Invalid picks JSON - missing required keys (locks, lotto_tickets, parlays)")
+    for key, typ in _PICKS_SCHEMA.items():
+        if not isinstance(picks_json[key], typ):
+            raise ValueError(f"Invalid picks JSON - '{key}' must be a {typ.__name__}")
+    
+    summary = picks_json.get("summary")
+    if summary is not None and not isinstance(summary, dict):
+        log.warning("[UPLOAD] ⚠ 'summary' is not an object - total_picks set to 0")
+        summary = None
+    total = summary.get("total", 0) if summary else 0
+    try:
+        total = int(total)
+    except (TypeError, ValueError):
+        log.warning("[UPLOAD] ⚠ 'summary.total' %r is not a number - total_picks set to 0", total)
+        total = 0
+    
+    generated_at = picks_json.get("generated_at")
+    if not generated_at or not isinstance(generated_at, str):
+        if generated_at is not None:
+            log.warning("[UPLOAD] ⚠ 'generated_at' %r is not a timestamp string - using now", generated_at)
+        generated_at = _utc_now_iso()
+    
+    window_mode = picks_json.get("window_mode", "pretip")
+    if not isinstance(window_mode, str):
+        log.warning("[UPLOAD] ⚠ 'window_mode' %r is not a string - using 'pretip'", window_mode)
+        window_mode = "pretip"
+    
+    return total, generated_at, window_mode
+
+
+def _store_raw_backup(today, picks_json):
+    """
+    Gzipped copy of the full picks JSON in the picks-raw Storage bucket.
+    Returns the object path for the row's raw_url, or None if the upload failed.
+    
+    Only used when STORE_RAW_BACKUP is set, and then daily_picks needs the
+    pointer column (upserts fail on an unknown column without it):
+    
+        ALTER TABLE daily_picks ADD COLUMN IF NOT EXISTS raw_url text;
+    """
+    raw_path = f"picks-raw/{today}.json.gz"
+    try:
+        resp = get_supabase_client().post(
+            f"{SUPABASE_URL.rstrip('/')}/storage/v1/object/{raw_path}",
+            headers={"Content-Type": "application/gzip", "x-upsert": "true"},
+            content=gzip.compress(_json_dumps(picks_json)),
+        )
+        resp.raise_for_status()
+        log.info("[UPLOAD] ✓ Raw backup stored as %s", raw_path)
+        return raw_path
+    except Exception as e:
+        log.warning("[UPLOAD] ⚠ Raw backup failed (picks still uploaded): %s", e)
+        return None
 
 
 def upload_picks_to_supabase(picks_json):
@@ -31,125 +192,314 @@ def upload_picks_to_supabase(picks_json):
     
     Args:
         picks_json: Dict from generate_picks_json() or path to JSON file
+    
+    Returns:
+        True once the row is stored (errors raise)
     """
     
     # If string path, load the JSON file
     if isinstance(picks_json, str):
-        with open(picks_json, 'r') as f:
-            picks_json = json.load(f)
+        with open(picks_json, 'rb') as f:
+            picks_json = _json_loads(f.read())
     
     # Validate structure
-    if 'locks' not in picks_json or 'lotto_tickets' not in picks_json or 'parlays' not in picks_json:
-        raise ValueError("Invalid picks JSON - missing required keys (locks, lotto_tickets, parlays)")
+    total_picks, generated_at, window_mode = _validate_picks(picks_json)
     
     today = date.today().isoformat()
     
     # Prepare data for Supabase
     data = {
         "date": today,
-        "generated_at": picks_json.get("generated_at", datetime.now().isoformat()),
+        "generated_at": generated_at,
         "locks": picks_json["locks"],
         "lotto_tickets": picks_json["lotto_tickets"],
         "parlays": picks_json["parlays"],
-        "window_mode": picks_json.get("window_mode", "pretip"),
-        "total_picks": picks_json.get("summary", {}).get("total", 0),
-        "raw_data": picks_json,  # Store full JSON as backup
+        "window_mode": window_mode,
+        "total_picks": total_picks,
         "email_sent": False
     }
     
-    print(f"[UPLOAD] Uploading picks for {today}...")
-    print(f"[UPLOAD] Total picks: {data['total_picks']}")
-    print(f"[UPLOAD]   - Locks: {len(data['locks'])}")
-    print(f"[UPLOAD]   - Lotto Tickets: {len(data['lotto_tickets'])}")
-    print(f"[UPLOAD]   - Parlays: {len(data['parlays'])}")
+    # Full JSON backup is opt-in and lives in Storage; the row only keeps a pointer
+    # (raw_url column - see _store_raw_backup for the DDL)
+    if os.getenv("STORE_RAW_BACKUP"):
+        raw_url = _store_raw_backup(today, picks_json)
+        if raw_url:
+            data["raw_url"] = raw_url
+    
+    log.info("[UPLOAD] Uploading picks for %s...", today)
+    log.info("[UPLOAD] Total picks: %s", data['total_picks'])
+    log.info("[UPLOAD]   - Locks: %s", len(data['locks']))
+    log.info("[UPLOAD]   - Lotto Tickets: %s", len(data['lotto_tickets']))
+    log.info("[UPLOAD]   - Parlays: %s", len(data['parlays']))
     
     try:
-        # Upsert (insert or update if exists)
-        result = supabase.table("daily_picks").upsert(
-            data,
-            on_conflict="date"  # Update if today's picks already exist
-        ).execute()
+        # Upsert (insert or update if exists); no row echoed back.
+        # Sent uncompressed: PostgREST doesn't decode Content-Encoding: gzip bodies.
+        get_supabase_client().post(
+            "/daily_picks",
+            params={"on_conflict": "date"},  # Update if today's picks already exist
+            headers={
+                "Prefer": "resolution=merge-duplicates,return=minimal",
+                "Content-Type": "application/json",
+            },
+            content=_json_dumps(data),
+        ).raise_for_status()
         
-        print(f"[UPLOAD] ✓ Success! Picks uploaded to Supabase")
-        return result.data[0] if result.data else None
+        log.info("[UPLOAD] ✓ Success! Picks uploaded to Supabase")
+        return True
         
     except Exception as e:
-        print(f"[UPLOAD] ✗ Error uploading to Supabase: {e}")
+        log.error("[UPLOAD] ✗ Error uploading to Supabase: %s", e)
         raise
 
 
-def get_todays_picks():
-    """Retrieve today's picks from Supabase"""
-    today = date.today().isoformat()
+def get_todays_picks(columns="date,total_picks,email_sent,generated_at", pick_date=None):
+    """Retrieve today's (or pick_date's) picks from Supabase (summary columns only by default)"""
+    today = pick_date or date.today().isoformat()
     
     try:
-        result = supabase.table("daily_picks").select("*").eq("date", today).execute()
+        rows = _rows(get_supabase_client().get(
+            "/daily_picks", params={"select": columns, "date": f"eq.{today}"}
+        ))
         
-        if result.data:
-            return result.data[0]
+        if rows:
+            return rows[0]
         else:
-            print(f"[FETCH] No picks found for {today}")
+            log.info("[FETCH] No picks found for %s", today)
             return None
             
     except Exception as e:
-        print(f"[FETCH] Error fetching picks: {e}")
+        log.error("[FETCH] Error fetching picks: %s", e)
         return None
 
 
+def get_todays_picks_full(pick_date=None):
+    """Retrieve today's (or pick_date's) full picks row, pick lists included"""
+    return get_todays_picks("*", pick_date)
+
+
+# Active subscribers change slowly; reuse one fetch for a few minutes
+SUBSCRIBERS_TTL_SEC = 300
+_subscribers_cache: list | None = None
+_subscribers_fetched_at = 0.0
+
+
+def invalidate_subscribers():
+    """Drop the cached subscriber list so the next read goes to Supabase"""
+    global _subscribers_cache
+    _subscribers_cache = None
+
+
 def get_subscribers():
     """Get all active subscribers for email sending"""
+    global _subscribers_cache, _subscribers_fetched_at
+    now_ts = time.time()
+    if _subscribers_cache is not None and (now_ts - _subscribers_fetched_at) < SUBSCRIBERS_TTL_SEC:
+        return list(_subscribers_cache)
+    try:
+        rows = _rows(get_supabase_client().get(
+            "/subscribers", params={"select": "email", "is_active": "eq.true"}
+        ))
+        _subscribers_cache = [row["email"] for row in rows]
+        _subscribers_fetched_at = now_ts
+        return list(_subscribers_cache)
+    except Exception as e:
+        log.error("[SUBSCRIBERS] Error fetching subscribers: %s", e)
+        return []
+
+
+def _copy_subscribers(emails, now):
+    """Bulk-load subscribers with COPY over the pooled Postgres connection"""
+    # prepare_threshold=None: the transaction-mode pooler can't keep prepared statements
+    with psycopg.connect(POSTGRES_POOL_URL, prepare_threshold=None) as conn:
+        with conn.cursor() as cur:
+            with cur.copy("COPY subscribers (email, verified_at) FROM STDIN") as copy:
+                for email in emails:
+                    copy.write_row((email, now))
+    return list(emails)
+
+
+def add_subscribers(emails):
+    """
+    Add several subscribers in a single insert; returns the added emails.
+    Uses COPY when POSTGRES_POOL_URL is set and the optional psycopg package is
+    installed, otherwise (or if COPY fails) a REST bulk insert.
+    """
+    emails = list(emails)
+    if not emails:
+        return []
+    now = _utc_now_iso()  # Auto-verify for now; one stamp for the whole batch
+    
+    # Bulk imports go straight to Postgres when a pooler URL and psycopg are available
+    if POSTGRES_POOL_URL and HAS_PSYCOPG:
+        try:
+            added = _copy_subscribers(emails, now)
+            invalidate_subscribers()
+            log.info("[SUBSCRIBER] ✓ Added %s via COPY", len(added))
+            return added
+        except Exception as e:
+            log.warning("[SUBSCRIBER] ⚠ COPY failed, falling back to REST: %s", e)
+    
     try:
-        result = supabase.table("subscribers").select("email").eq("is_active", True).execute()
-        return [row["email"] for row in result.data]
+        rows = _rows(get_supabase_client().post(
+            "/subscribers",
+            params={"select": "email"},
+            headers={"Prefer": "return=representation"},
+            json=[{"email": email, "verified_at": now} for email in emails],
+        ))
+        
+        invalidate_subscribers()
+        for email in emails:
+            log.info("[SUBSCRIBER] ✓ Added: %s", email)
+        return [row["email"] for row in rows]
+        
     except Exception as e:
-        print(f"[SUBSCRIBERS] Error fetching subscribers: {e}")
+        log.error("[SUBSCRIBER] ✗ Error adding %s: %s", ', '.join(emails), e)
         return []
 
 
 def add_subscriber(email):
-    """Add a new subscriber"""
+    """Add a new subscriber; returns the email, or None if it wasn't added"""
+    added = add_subscribers([email])
+    return added[0] if added else None
+
+
+def mark_email_sent(pick_date=None, sent=True):
+    """Mark today's picks as email sent (sent=False releases a fetch_and_mark_sent claim)"""
+    if pick_date is None:
+        pick_date = date.today().isoformat()
+    
     try:
-        result = supabase.table("subscribers").insert({
-            "email": email,
-            "verified_at": datetime.now().isoformat()  # Auto-verify for now
-        }).execute()
+        resp = get_supabase_client().patch(
+            "/daily_picks",
+            params={"date": f"eq.{pick_date}"},
+            headers={"Prefer": "return=minimal,count=exact"},
+            json={
+                "email_sent": sent,
+                "email_sent_at": _utc_now_iso() if sent else None
+            },
+        )
+        resp.raise_for_status()
+        
+        if _matched_count(resp) == 0:
+            log.warning("[EMAIL] ⚠ No picks row for %s - nothing marked", pick_date)
+            return False
         
-        print(f"[SUBSCRIBER] ✓ Added: {email}")
-        return result.data[0] if result.data else None
+        log.info("[EMAIL] ✓ Marked picks as %s for %s", 'sent' if sent else 'unsent', pick_date)
+        return True
         
     except Exception as e:
-        print(f"[SUBSCRIBER] ✗ Error adding {email}: {e}")
+        log.error("[EMAIL] ✗ Error marking email sent: %s", e)
+        return False
+
+
+def _fetch_then_mark_sent(pick_date, force):
+    """
+    Two-call fallback for fetch_and_mark_sent: read the row, then flag it.
+    Not atomic like the RPC, but keeps the email run working without it.
+    """
+    row = get_todays_picks_full(pick_date)
+    if not row:
         return None
+    if row.get("email_sent") and not force:
+        log.info("[FETCH] Picks for %s already sent (use --force to resend)", pick_date)
+        return None
+    if not mark_email_sent(pick_date):
+        log.warning("[FETCH] ⚠ Could not flag %s as sent; sending anyway", pick_date)
+    return row
 
 
-def mark_email_sent(pick_date=None):
-    """Mark today's picks as email sent"""
+def fetch_and_mark_sent(pick_date=None, force=False):
+    """
+    Fetch the day's picks and flag them email_sent in one round-trip.
+    
+    Returns the picks row, or None when there are no picks or they were
+    already claimed by an earlier run. force=True resends a claimed day.
+    Uses the fetch_and_mark_sent SQL function from
+    supabase/migrations/20261016000000_fetch_and_mark_sent.sql; if it isn't
+    deployed (404), falls back to a plain fetch followed by mark_email_sent().
+    """
     if pick_date is None:
         pick_date = date.today().isoformat()
+    if force:
+        return _fetch_then_mark_sent(pick_date, force=True)
     
     try:
-        result = supabase.table("daily_picks").update({
-            "email_sent": True,
-            "email_sent_at": datetime.now().isoformat()
-        }).eq("date", pick_date).execute()
-        
-        print(f"[EMAIL] ✓ Marked picks as sent for {pick_date}")
-        return result.data[0] if result.data else None
+        resp = get_supabase_client().post(
+            "/rpc/fetch_and_mark_sent",
+            params={"select": EMAIL_PICK_COLUMNS},
+            json={"p_date": pick_date},
+        )
+        if resp.status_code == 404:
+            log.warning("[FETCH] ⚠ fetch_and_mark_sent RPC not deployed - using fetch + mark")
+            return _fetch_then_mark_sent(pick_date, force=False)
+        rows = _rows(resp)
         
+        if rows:
+            return rows[0]
+        else:
+            log.info("[FETCH] No unsent picks found for %s (use --force to resend)", pick_date)
+            return None
+            
     except Exception as e:
-        print(f"[EMAIL] ✗ Error marking email sent: {e}")
+        log.error("[FETCH] Error fetching picks: %s", e)
         return None
 
 
+def upload_and_mark_sent(picks_json, mark_date):
+    """
+    Upload today's picks and mark an earlier day's picks as emailed.
+    The two touch different rows, so they run side by side on a small pool;
+    each failure is logged on its own and doesn't stop the other. Marking
+    today itself waits for the upload, since it needs today's row to exist.
+    Returns (uploaded, marked) booleans.
+    """
+    if mark_date == date.today().isoformat():
+        uploaded = _logged("upload", upload_picks_to_supabase, picks_json)
+        marked = _logged("mark_sent", mark_email_sent, mark_date) if uploaded else False
+        return uploaded, marked
+    
+    get_supabase_client()  # build the shared client once, before both threads want it
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        up = pool.submit(_logged, "upload", upload_picks_to_supabase, picks_json)
+        mk = pool.submit(_logged, "mark_sent", mark_email_sent, mark_date)
+    return up.result(), mk.result()
+
+
+def _logged(name, fn, *args):
+    """Run fn, turning an exception into a logged False"""
+    try:
+        return bool(fn(*args))
+    except Exception as e:
+        log.error("[UPLOAD] ✗ %s failed: %s", name, e)
+        return False
+
+
+def _upload(path, mark_date):
+    if mark_date:
+        uploaded, marked = upload_and_mark_sent(path, mark_date)
+        if not (uploaded and marked):
+            sys.exit(1)
+        return
+    try:
+        upload_picks_to_supabase(path)
+    except Exception as e:
+        log.error("[UPLOAD] ✗ Upload failed: %s", e)
+        sys.exit(1)
+
+
 def main():
     """CLI for uploading picks"""
     import argparse
     
+    configure_logging()
+    
     parser = argparse.ArgumentParser(description="Upload picks to Supabase")
     parser.add_argument("--file", "-f", help="Path to picks JSON file")
     parser.add_argument("--test", action="store_true", help="Test connection and fetch today's picks")
     parser.add_argument("--subscribers", action="store_true", help="List all subscribers")
-    parser.add_argument("--add-subscriber", help="Add subscriber email")
+    parser.add_argument("--add-subscriber", action="append", help="Add subscriber email (repeatable)")
+    parser.add_argument("--mark-sent", metavar="DATE", help="Mark DATE's picks as emailed (alongside any upload)")
     
     args = parser.parse_args()
     
@@ -170,17 +520,19 @@ def main():
         print(f"\nTotal: {len(emails)}")
     
     elif args.add_subscriber:
-        add_subscriber(args.add_subscriber)
+        add_subscribers(args.add_subscriber)
     
     elif args.file:
-        upload_picks_to_supabase(args.file)
+        _upload(args.file, args.mark_sent)
     
     else:
         # Try to load from default output
         default_file = "picks.json"
         if os.path.exists(default_file):
             print(f"Using {default_file}...")
-            upload_picks_to_supabase(default_file)
+            _upload(default_file, args.mark_sent)
+        elif args.mark_sent:
+            mark_email_sent(args.mark_sent)
         else:
             print("Usage:")
             print("  python upload_to_supabase.py --file picks.json")